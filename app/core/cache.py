@@ -0,0 +1,198 @@
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """ 크기 제한(LRU)과 만료시간(TTL)이 있는 프로세스 내 캐시 """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class DiskCacheWriter:
+    """ 캐시에 넣을 파일을 임시 파일에 쓰다가 commit 때 rename 으로 공개 """
+
+    def __init__(self, cache: "DiskLRUCache", path: Path):
+        self.cache = cache
+        self.path = path
+        self.size = 0
+        fd, tmp = tempfile.mkstemp(dir=cache.root, prefix=".tmp-")
+        self.tmp = Path(tmp)
+        self.file: BinaryIO | None = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if self.file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_bytes:
+            # 캐시 전체보다 큰 파일은 넣지 않음
+            self.abort()
+            return
+        try:
+            self.file.write(chunk)
+        except OSError:
+            # 디스크가 차는 등 캐시 쓰기 실패는 다운로드에 영향을 주지 않음
+            self.abort()
+
+    def commit(self) -> None:
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp, self.path)
+        except OSError:
+            self.abort()
+            return
+        self.cache.evict()
+
+    def abort(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.tmp.unlink(missing_ok=True)
+
+
+class DiskLRUCache:
+    """ 
+    여러 워커가 같은 디렉터리를 공유하는 크기 제한 디스크 캐시.
+    파일은 임시 파일에 쓴 뒤 rename 으로 넣고 (반쯤 쓴 파일이 보이지 않음), 
+    마지막 사용 시각을 mtime 에 기록해 max_bytes 를 넘으면 오래된 것부터 지움.
+    이미 열린 파일은 다른 워커가 지워도 끝까지 읽을 수 있음
+    """
+    # 이보다 오래된 임시 파일은 죽은 워커가 남긴 것으로 보고 정리
+    stale_tmp_seconds = 3600
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes = 0
+
+    def _prefix(self, key: str) -> str:
+        return f"{_digest(key)}-"
+
+    def _path(self, key: str, version: str) -> Path:
+        return self.root / f"{self._prefix(key)}{_digest(version)}"
+
+    def open(self, key: str, version: str) -> BinaryIO | None:
+        path = self._path(key, version)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return f
+
+    def writer(self, key: str, version: str) -> DiskCacheWriter:
+        return DiskCacheWriter(self, self._path(key, version))
+
+    def invalidate(self, key: str) -> None:
+        """ key 의 모든 버전을 지움 """
+        for path in self.root.glob(f"{self._prefix(key)}*"):
+            path.unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        now = time.time()
+        for entry in os.scandir(self.root):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.startswith(".tmp-"):
+                if now - st.st_mtime > self.stale_tmp_seconds:
+                    Path(entry.path).unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.bytes = total
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
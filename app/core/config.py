@@ -55,6 +55,14 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
+    # stream 모드에서 서버 사이드 커서로 한 번에 가져올 행 수
+    STREAM_YIELD_PER: int = 500
+
+    DASHBOARD_STATS_TTL_SECONDS: int = 60
+    # 프로젝트 검색에서 유사도 순위를 매길 최근 후보 수
+    PROJECT_SEARCH_RANK_CANDIDATES: int = 500
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -122,10 +130,89 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     JWT_SECRET_KEY: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAXSIZE: int = 1024
+
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_CONCURRENCY: int = 8
     
     OPENAI_API_KEY: str
-    AZURE_BLOB_KEY: str
-    AZURE_BLOB_CONTAINER: str
+    OPENAI_BASE_URL: str | None = None
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_SECONDS: float = 30
+    OPENAI_TIMEOUT_SECONDS: float = 60
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5
+    OPENAI_MAX_RETRIES: int = 2
+
+    # 프로세스 안에서 LLM 호출을 제한. 분당 한도는 응답의 x-ratelimit-* 헤더를 받으면 그 값으로 바뀜
+    LLM_MAX_IN_FLIGHT: int = 8
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200_000
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 30
+    LLM_EXPECTED_OUTPUT_TOKENS: int = 1000
+
+    # 같은 query 의 프로젝트 생성 결과를 재사용하는 캐시, Idempotency-Key 로 다시 온 요청의 결과 보관
+    LLM_CACHE_TTL_SECONDS: int = 600
+    LLM_CACHE_MAXSIZE: int = 1024
+    IDEMPOTENCY_TTL_SECONDS: int = 3600
+    IDEMPOTENCY_MAXSIZE: int = 4096
+
+    # Thread 대화 기록 압축: 메시지 수나 내용 크기가 넘으면 오래된 메시지를 summary 로 요약하고 ThreadArchive 로 옮김
+    THREAD_COMPACT_INTERVAL_SECONDS: float = 300  # 0 이면 끔
+    THREAD_COMPACT_BATCH_SIZE: int = 20
+    THREAD_COMPACT_MAX_MESSAGES: int = 50
+    THREAD_COMPACT_MAX_BYTES: int = 64 * 1024
+    THREAD_COMPACT_KEEP_MESSAGES: int = 10
+    THREAD_SUMMARIZER: Literal["llm", "local"] = "llm"
+    # summary 와 요약할 때 LLM 에 넣는 대화의 토큰 상한
+    THREAD_SUMMARY_MAX_TOKENS: int = 500
+    THREAD_SUMMARY_INPUT_TOKENS: int = 4000
+    # Thread.get_history 가 한 번에 읽는 메시지 수
+    THREAD_HISTORY_PAGE_SIZE: int = 50
+
+    # LLM 프로젝트 생성 작업 (ProjectJob) 을 동시에 실행할 워커 수와 제한 시간
+    PROJECT_JOB_WORKERS: int = 4
+    PROJECT_JOB_POLL_SECONDS: float = 2
+    PROJECT_JOB_TIMEOUT_SECONDS: int = 120
+    PROJECT_JOB_MAX_ATTEMPTS: int = 3
+    # LLM limiter 대기열에서 차례가 오지 않은 작업은 실패시키지 않고 이만큼 미뤄 다시 대기열에 넣음
+    PROJECT_JOB_THROTTLE_DELAY_SECONDS: float = 5
+
+    # 첨부파일 저장소: azure (Blob Storage) 또는 local (LOCAL_STORAGE_ROOT 디렉터리)
+    STORAGE_BACKEND: Literal["azure", "local"] = "azure"
+    LOCAL_STORAGE_ROOT: str = "./storage"
+
+    AZURE_BLOB_KEY: str | None = None
+    AZURE_BLOB_CONTAINER: str | None = None
+    # 업로드를 나눠 올릴 블록 크기와 동시에 올릴 블록 수 (메모리 상한 = 둘의 곱)
+    BLOB_UPLOAD_BLOCK_SIZE: int = 4 * 1024 * 1024
+    BLOB_UPLOAD_CONCURRENCY: int = 4
+    AZURE_BLOB_POOL_SIZE: int = 64
+    AZURE_BLOB_KEEPALIVE_SECONDS: int = 30
+    AZURE_BLOB_CONNECTION_TIMEOUT: int = 10
+    AZURE_BLOB_READ_TIMEOUT: int = 60
+    # 설정하면 Azure 에서 내려받은 파일을 이 디렉터리에 캐시 (워커끼리 공유 가능)
+    BLOB_CACHE_DIR: str | None = None
+    BLOB_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # blob 삭제 작업 큐 (BlobDeleteJob) 처리
+    BLOB_DELETE_BATCH_SIZE: int = 100
+    BLOB_DELETE_POLL_SECONDS: float = 5
+    BLOB_DELETE_MAX_ATTEMPTS: int = 10
+    BLOB_DELETE_RETRY_SECONDS: int = 30
+    BLOB_DELETE_RETRY_MAX_SECONDS: int = 3600
+    # 어디서도 참조하지 않는 blob 정리 주기 (0 이면 끔). grace 보다 최근에 올라온 파일은 건드리지 않음
+    BLOB_SWEEP_INTERVAL_SECONDS: int = 0
+    BLOB_SWEEP_GRACE_SECONDS: int = 24 * 3600
+
+    @model_validator(mode="after")
+    def _require_azure_settings(self) -> Self:
+        if self.STORAGE_BACKEND == "azure" and not (self.AZURE_BLOB_KEY and self.AZURE_BLOB_CONTAINER):
+            raise ValueError("AZURE_BLOB_KEY and AZURE_BLOB_CONTAINER are required for the azure storage backend")
+        return self
 
 
 settings = Settings() # type: ignore
\ No newline at end of file
@@ -1,27 +1,85 @@
-from sqlmodel import (
-    create_engine, 
-    SQLModel, 
-    Session, 
-    select
-)
-    
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import BigInteger, Integer, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
 from app.core.config import settings
 from app.models import *
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), echo=True)
+engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), 
+    echo=True,
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+
+def new_session() -> AsyncSession:
+    # commit 이후 속성 접근시 lazy load(동기 IO)가 일어나지 않도록 expire 하지 않음
+    return AsyncSession(engine, expire_on_commit=False)
+
+def _add_missing_columns(conn):
+    # create_all 은 기존 테이블에 새 컬럼을 추가하지 않으므로 따로 추가
+    # (nullable 이거나 DB 가 계산하는 컬럼만 이 방식으로 추가할 수 있음)
+    inspector = inspect(conn)
+    compiler = conn.dialect.ddl_compiler(conn.dialect, None)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {compiler.preparer.format_table(table)} "
+                f"ADD COLUMN IF NOT EXISTS {compiler.get_column_specification(column)}"
+            ))
+
+def _widen_integer_columns(conn):
+    # create_all 은 기존 컬럼의 타입을 바꾸지 않으므로 INTEGER 로 만들어진 컬럼이 BIGINT 로 선언됐으면 넓힘
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, BigInteger):
+                continue
+            current = existing.get(column.name)
+            if isinstance(current, Integer) and not isinstance(current, BigInteger):
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ALTER COLUMN {preparer.format_column(column)} TYPE BIGINT"
+                ))
+
+def _create_missing_indexes(conn):
+    # create_all 은 이미 있는 테이블에 새로 선언된 인덱스를 만들지 않으므로 따로 확인
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def init_db(db: AsyncSession):
+    async with engine.begin() as conn:
+        # 부분일치 검색용 trigram 인덱스
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_widen_integer_columns)
+
+    await BizClient.backfill_search_keys(db)
+    await Thread.backfill_messages(db)
+    # 유니크 인덱스를 만들기 전에 중복 행을 정리
+    await Thread.merge_duplicates(db)
 
-def init_db(db: Session):
-    SQLModel.metadata.create_all(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_missing_indexes)
 
     admin_name = settings.FIRST_SUPERUSER
     admin_pw = settings.FIRST_SUPERUSER_PASSWORD
 
-    exist = User.get(db, admin_name)
+    exist = await User.get(db, admin_name)
     
     if exist:
         return None
     
-    User.create(
+    await User.create(
         db,
         UserCreate(
             name=admin_name, 
@@ -0,0 +1,12 @@
+from typing import Any, Callable
+
+_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    """ /metrics 에 노출할 카운터 묶음을 등록 """
+    _sources[name] = source
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    return {name: source() for name, source in _sources.items()}
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+
+class LimiterTimeout(TimeoutError):
+    """ 대기열에서 제한 시간 안에 차례가 오지 않음 """
+
+
+class TokenBucket:
+    """ per_seconds 동안 capacity 만큼 차오르는 예산 """
+
+    def __init__(self, capacity: float, per_seconds: float = 60):
+        self.capacity = capacity
+        self.per_seconds = per_seconds
+        self.rate = capacity / per_seconds
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """ amount 를 쓸 수 있을 때까지 남은 초. capacity 보다 큰 요청은 가득 찼을 때 통과 """
+        self._refill()
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def sync(self, limit: int | None, remaining: int | None) -> None:
+        """ 서버가 응답 헤더로 알려준 한도와 잔량에 맞춤 """
+        if limit:
+            self.capacity = limit
+            self.rate = limit / self.per_seconds
+        self._refill()
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+
+class Limiter:
+    """
+    동시 실행 수와 분당 요청/토큰 예산을 함께 지키는 limiter.
+    먼저 온 순서대로(FIFO) 차례를 받고, 맨 앞만 자리와 예산을 기다리므로 뒤에 온 요청이 앞지르지 않음.
+    timeout 안에 차례가 오지 않으면 LimiterTimeout
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        timeout: float
+    ):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+        self._turn = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._paused_until = 0.0
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.throttled = 0
+
+    def pause(self, seconds: float) -> None:
+        """ 429 등으로 서버가 기다리라고 하면 그동안 새 요청을 보내지 않음 """
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_time(self, tokens: int) -> float:
+        return max(
+            self._paused_until - time.monotonic(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+        )
+
+    async def _acquire(self, tokens: int) -> None:
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self._turn:
+                    await self._slots.acquire()
+                    try:
+                        while (wait := self._wait_time(tokens)) > 0:
+                            await asyncio.sleep(wait)
+                    except BaseException:
+                        self._slots.release()
+                        raise
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+        except TimeoutError:
+            self.timeouts += 1
+            raise LimiterTimeout(f"{self.timeout}초 안에 차례가 오지 않았습니다.") from None
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """ 예상 토큰 수 만큼 예산을 쓰고 자리를 하나 차지함 """
+        await self._acquire(tokens)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "throttled": self.throttled,
+            "paused_seconds": max(self._paused_until - time.monotonic(), 0.0),
+            "requests_per_minute": self.requests.capacity,
+            "requests_available": self.requests.level,
+            "tokens_per_minute": self.tokens.capacity,
+            "tokens_available": self.tokens.level,
+        }
@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from argon2 import PasswordHasher
+
+from app.core import metrics
+from app.core.config import settings
+
+encoder = PasswordHasher()
+
+_executor: Executor | None = None
+# 동시에 실행(대기 포함)되는 해시 연산 수 제한. 초과분은 여기서 대기
+_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
+_stats = {
+    "waiting": 0,
+    "running": 0,
+    "completed": 0,
+}
+metrics.register("password_hash", lambda: dict(_stats))
+
+
+def _hash(password: str) -> str:
+    return encoder.hash(password)
+
+
+def _verify(hashed: str, password: str) -> bool:
+    try:
+        return encoder.verify(hashed, password)
+    except Exception:
+        return False
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            # argon2 는 C 확장에서 GIL 을 풀기 때문에 스레드로도 병렬 실행됨
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _executor
+
+
+async def _run(fn: Callable[..., Any], *args: Any) -> Any:
+    _stats["waiting"] += 1
+    async with _semaphore:
+        _stats["waiting"] -= 1
+        _stats["running"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_executor(), fn, *args)
+        finally:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(hashed: str, password: str) -> bool:
+    return await _run(_verify, hashed, password)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
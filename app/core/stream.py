@@ -0,0 +1,35 @@
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# OpenAPI 문서용 (stream 모드 응답 형식)
+NDJSON_RESPONSES: dict = {200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+SSE_RESPONSES: dict = {200: {"content": {SSE_MEDIA_TYPE: {}}}}
+
+
+def ndjson_response(items: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """ 모델을 한 줄에 하나씩 JSON 으로 흘려보냄 (전체 목록을 메모리에 만들지 않음) """
+
+    async def lines():
+        async for item in items:
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """ server-sent events. 프록시가 버퍼링하지 않도록 헤더를 붙임 """
+    return StreamingResponse(
+        events, 
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,50 @@
+def escape_like(query: str) -> str:
+    """ LIKE 패턴의 와일드카드 문자를 이스케이프 """
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# 한글 호환 자모 초성 (가 ~ 힣 음절 순서)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_FIRST, HANGUL_LAST = ord("가"), ord("힣")
+# 초성 하나당 음절 수 (중성 21 * 종성 28)
+SYLLABLES_PER_CHOSUNG = 21 * 28
+
+PHONE_CHARS = set("0123456789-+.() ")
+
+
+def to_chosung(text: str) -> str:
+    """ 한글 음절을 초성으로 바꾸고 공백은 제거 (김성 동 -> ㄱㅅㄷ) """
+    result = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_FIRST <= code <= HANGUL_LAST:
+            result.append(CHOSUNG[(code - HANGUL_FIRST) // SYLLABLES_PER_CHOSUNG])
+        elif not ch.isspace():
+            result.append(ch)
+    return "".join(result)
+
+
+def is_chosung(text: str) -> bool:
+    """ 공백을 제외한 모든 글자가 초성인지 """
+    compact = "".join(text.split())
+    return bool(compact) and all(ch in CHOSUNG for ch in compact)
+
+
+def only_digits(text: str) -> str:
+    return "".join(ch for ch in text if ch.isdigit())
+
+
+def is_phone_like(text: str) -> bool:
+    """ 숫자와 전화번호 구분자(- . 공백 등)로만 이루어졌는지 """
+    return any(ch.isdigit() for ch in text) and all(ch in PHONE_CHARS for ch in text)
+
+
+def to_ascii_key(text: str) -> str:
+    """ 영문/숫자만 소문자로 남김 (Kim.SD_01 -> kimsd01) """
+    return "".join(ch for ch in text.lower() if ch.isascii() and ch.isalnum())
+
+
+def is_ascii_word(text: str) -> bool:
+    """ 영문 글자가 있고 공백을 제외하면 ASCII 로만 이루어졌는지 (이메일 아이디로 찾을 만한 검색어) """
+    compact = "".join(text.split())
+    return any(ch.isascii() and ch.isalpha() for ch in compact) and compact.isascii()
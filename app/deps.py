@@ -1,41 +1,81 @@
 import jwt
+import time
 import uuid
-from collections.abc import Generator
-from azure.storage.blob import BlobServiceClient
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from sqlmodel import Session
-from fastapi import Depends, Header, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import Depends, Header, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 
-from app.core.db import engine
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.db import new_session
+from app.core.stream import NDJSON_MEDIA_TYPE
 from app.core.config import settings
 from app.models import Payload, User
+from app.modules.project_jobs import ProjectJobPool
+from app.modules.storage import Storage
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"api/v1/users/sign_in"
 )
 
-def get_blob_client():
-    return BlobServiceClient.from_connection_string(settings.AZURE_BLOB_KEY)
+def get_storage(request: Request) -> Storage:
+    return request.app.state.storage
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def get_project_jobs(request: Request) -> ProjectJobPool:
+    return request.app.state.project_jobs
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with new_session() as session:
         yield session
 
 def get_request():
     return uuid.uuid4()
 
+def wants_stream(
+    stream: bool = Query(False), 
+    accept: str | None = Header(None)
+) -> bool:
+    return stream or (accept is not None and NDJSON_MEDIA_TYPE in accept)
+
+def wants_job(
+    job: bool = Query(False), 
+    prefer: str | None = Header(None)
+) -> bool:
+    return job or (prefer is not None and "respond-async" in prefer)
+
+def get_idempotency_key(
+    idempotency_key: str | None = Header(None, max_length=255)
+) -> str | None:
+    return idempotency_key
+
 security = HTTPBearer()
 
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
-SessionDep = Annotated[Session, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
 RequestDep = Annotated[uuid.UUID, Depends(get_request)]
-BlobClientDep = Annotated[BlobServiceClient, Depends(get_blob_client)]
+StreamDep = Annotated[bool, Depends(wants_stream)]
+StorageDep = Annotated[Storage, Depends(get_storage)]
+JobDep = Annotated[bool, Depends(wants_job)]
+ProjectJobPoolDep = Annotated[ProjectJobPool, Depends(get_project_jobs)]
+IdempotencyKeyDep = Annotated[str | None, Depends(get_idempotency_key)]
+
+# 검증이 끝난 토큰의 디코딩 결과 캐시 (key: 원본 토큰, 만료시각 이후로는 보관하지 않음)
+token_cache: TTLCache[str, Payload] = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE, 
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+metrics.register("auth_token_cache", token_cache.stats)
+
+def decode_token(token: str) -> Payload:
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=settings.JWT_ALGORITHM)
         payload = Payload(**payload)
@@ -45,7 +85,13 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = User.get(db = session, name=payload.sub)
+    
+    token_cache.set(token, payload, ttl=payload.exp.timestamp() - time.time())
+    return payload
+
+async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    payload = decode_token(token)
+    user = await User.get_cached(db = session, name=payload.sub)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,25 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.db import init_db
-from app.deps import get_db
+from app.core.db import engine, init_db, new_session
+from app.core.security import shutdown_executor
+from app.modules import llm
+from app.modules.cleanup import create_cleanup_worker
+from app.modules.compaction import create_thread_compactor
+from app.modules.project_jobs import create_project_job_pool
+from app.modules.storage import create_storage
 from app.routers import (
     user_r,
     dashboard_r,
     bizcard_r,
-    program_r
+    program_r,
+    metrics_r
 
 )
 from app.static import UIMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with new_session() as db:
+        await init_db(db)
+
+    app.state.storage = create_storage()
+    app.state.blob_cleanup = create_cleanup_worker(app.state.storage)
+    app.state.blob_cleanup.start()
+    llm.get_client()
+    app.state.project_jobs = create_project_job_pool()
+    app.state.project_jobs.start()
+    app.state.thread_compactor = create_thread_compactor()
+    app.state.thread_compactor.start()
+
+    yield
+
+    await app.state.thread_compactor.stop()
+    await app.state.project_jobs.stop()
+    await llm.close_client()
+    await app.state.blob_cleanup.stop()
+    await app.state.storage.close()
+    shutdown_executor()
+    await engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
-init_db(db = next(get_db()))
-
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -34,5 +66,6 @@ app.include_router(user_r, prefix=f"{settings.API_V1_STR}/users", tags=["users"]
 app.include_router(dashboard_r, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
 app.include_router(bizcard_r, prefix=f"{settings.API_V1_STR}/biz", tags=["biz"])
 app.include_router(program_r, prefix=f"{settings.API_V1_STR}/program", tags=["program"])
+app.include_router(metrics_r, prefix=f"{settings.API_V1_STR}/metrics", tags=["metrics"])
 
 app.add_middleware(UIMiddleware)
\ No newline at end of file
@@ -18,7 +18,11 @@ from .api import (
     ProjectProgress,
     PutBizcardsResponse,
     PutBizcardsRequest,
-    GetBizcardDetailResponse
+    GetBizcardDetailResponse,
+    GetMetricsResponse,
+    GetDashboardStatsResponse,
+    PostCreateProjectJobResponse,
+    GetProjectJobResponse
 )
 from .bizcard import (
     BizClientDTO,
@@ -28,6 +32,7 @@ from .bizcard import (
 from .dashboard import (
     Project,
     ProjectDTO,
+    ProjectStats,
 )
 from .enum import (
     ProjectPriority,
@@ -36,18 +41,23 @@ from .enum import (
     UType,
     CreateProjectOptions,
     Role,
-    OrderBy
+    OrderBy,
+    JobStatus
 )
 from .prompt import (
     Prompt,
     PromptConfig,
     Message,
-    Thread
+    Thread,
+    ThreadArchive,
+    ThreadMessage
 )
 from .program import (
     Program,
     ProgramDTO
 )
+from .blob import StoredBlob, BlobDeleteJob
+from .job import ProjectJob, ProjectJobDTO
 
 __all__ =[
     'User',
@@ -86,4 +96,16 @@ __all__ =[
     'PutBizcardsRequest',
     'GetBizcardDetailResponse',
     'ProgramDTO',
+    'GetMetricsResponse',
+    'ProjectStats',
+    'GetDashboardStatsResponse',
+    'StoredBlob',
+    'BlobDeleteJob',
+    'JobStatus',
+    'ProjectJob',
+    'ProjectJobDTO',
+    'PostCreateProjectJobResponse',
+    'GetProjectJobResponse',
+    'ThreadArchive',
+    'ThreadMessage',
 ]
\ No newline at end of file
@@ -1,17 +1,19 @@
 import uuid
 
 from pydantic import BaseModel, Field
-from typing import List
-from .dashboard import ProjectDTO
+from typing import Any, Dict, List
+from .dashboard import ProjectDTO, ProjectStats
 from .enum import ProjectPriority, ProjectCategory
 from .bizcard import BizClientDTO
 from .program import ProgramDTO
+from .job import ProjectJobDTO
 
 class BaseResponse(BaseModel):
     request_id: uuid.UUID = Field(default_factory=uuid.uuid4)
 
 class GetDashboardResponse(BaseResponse):
     projects: List[ProjectDTO]
+    next_cursor: str | None = Field(default=None)
 
 class PostCreateProjectRequest(BaseModel):
     query: str
@@ -21,6 +23,13 @@ class PostCreateProjectRequest(BaseModel):
 
 class PostCreateProjectResponse(BaseResponse):
     status: bool
+    project_id: uuid.UUID | None = Field(default=None)
+
+class PostCreateProjectJobResponse(BaseResponse):
+    job: ProjectJobDTO
+
+class GetProjectJobResponse(BaseResponse):
+    job: ProjectJobDTO
 
 class PutModifyProjectRequest(BaseModel):
     u_id: uuid.UUID
@@ -60,6 +69,9 @@ class ProjectProgress(BaseModel):
 class ProjectProgressResponse(BaseResponse):
     projects: List[ProjectProgress]
 
+class GetDashboardStatsResponse(BaseResponse):
+    stats: ProjectStats
+
 
 class GetBizcardsResponse(BaseResponse):
     bizcards: List[BizClientDTO]
@@ -75,3 +87,7 @@ class PutBizcardsResponse(BaseResponse):
 class GetBizcardDetailResponse(BaseResponse):
     biz_card: BizClientDTO
     programs: List[ProgramDTO]
+
+
+class GetMetricsResponse(BaseResponse):
+    metrics: Dict[str, Dict[str, Any]]
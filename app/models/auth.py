@@ -2,14 +2,22 @@ import datetime
 import jwt
 import uuid
 from pydantic import BaseModel, Field
-from sqlmodel import SQLModel, Session, Field as SQLModelField, select
-
-from argon2 import PasswordHasher
+from sqlmodel import SQLModel, Field as SQLModelField, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, inspect
 
 from app.models.enum import UType
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.security import hash_password, verify_password
 
-encoder = PasswordHasher()
+# 인증된 요청마다 반복되는 유저 조회를 줄이기 위한 캐시 (key: User.name)
+user_cache: TTLCache[str, "User"] = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE, 
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+metrics.register("auth_user_cache", user_cache.stats)
 
 
 class UserCreate(BaseModel):
@@ -40,26 +48,26 @@ class User(SQLModel, table=True):
     user_type: UType = SQLModelField(default=UType.STAFF)
 
     @classmethod
-    def get_all(cls, db: Session):
+    async def get_all(cls, db: AsyncSession):
         try:
             stmt = select(cls)
-            return db.exec(stmt).all()
+            return (await db.exec(stmt)).all()
         except Exception as e:
             print("유저 정보 조회중 오류남: ", e)
             return None
 
     @classmethod
-    def create(cls, db: Session, user: UserCreate):
+    async def create(cls, db: AsyncSession, user: UserCreate):
         
         try:
-            exist = cls.get(db, user.name)
+            exist = await cls.get(db, user.name)
             if exist:
                 return None
         except Exception as e:
             print("유저 중복 확인중 오류남: ", e)
             return None
         
-        hashed = encoder.hash(user.password+settings.PEPPER)
+        hashed = await hash_password(user.password+settings.PEPPER)
 
         try:
             new_record = cls(
@@ -71,37 +79,63 @@ class User(SQLModel, table=True):
                 user_type=UType.STAFF
             )
             db.add(new_record)
-            db.commit()
+            await db.commit()
             return new_record
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print("유저 생성중 오류남: ", e)
             return None
         
     @classmethod
-    def get(cls, db: Session, name: str):
+    async def get(cls, db: AsyncSession, name: str):
         try:
             stmt = select(cls).where(cls.name == name)
-            return db.exec(stmt).first()
+            return (await db.exec(stmt)).first()
         except Exception as e:
             print("유저 정보 조회중 오류남: ", e)
             return None
+
+    @classmethod
+    async def get_cached(cls, db: AsyncSession, name: str):
+        cached = user_cache.get(name)
+        if cached is not None:
+            return cached
+        
+        user = await cls.get(db, name)
+        if user is None:
+            return None
         
+        # 다른 요청의 세션 rollback/expire 에 영향받지 않도록 세션에서 분리해서 보관
+        db.expunge(user)
+        user_cache.set(name, user)
+        return user
+    
     @classmethod
-    def get_by_id(cls, db: Session, u_id: uuid.UUID):
+    def invalidate(cls, *names: str):
+        for name in names:
+            user_cache.pop(name)
+        
+    @classmethod
+    async def get_by_id(cls, db: AsyncSession, u_id: uuid.UUID):
         try:
             stmt = select(cls).where(cls.u_id == u_id)
-            return db.exec(stmt).first()
+            return (await db.exec(stmt)).first()
         except Exception as e:
             print("유저 정보 조회중 오류남: ", e)
             return
         
 
-    def verify(self, password: str):
-        try:
-            return encoder.verify(self.password, password+settings.PEPPER)
-        except Exception:
-            return False
+    async def verify(self, password: str):
+        return await verify_password(self.password, password+settings.PEPPER)
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_cache(mapper, connection, target: User):
+    # 이름이 바뀐 경우 이전 이름으로 캐시된 항목도 제거
+    history = inspect(target).attrs.name.history
+    User.invalidate(target.name, *(history.deleted or ()))
+
 
 class Payload(BaseModel):
     sub: str
@@ -1,15 +1,56 @@
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
-from sqlmodel import SQLModel, Field as SQLModelField, select, Session, update
+from sqlmodel import SQLModel, Field as SQLModelField, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from sqlalchemy import func, or_
+from sqlalchemy import Column, Computed, Index, Text, event, or_
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql.expression import desc
 
+from app.core.config import settings
+from app.core.text import (
+    escape_like,
+    is_ascii_word,
+    is_chosung,
+    is_phone_like,
+    only_digits,
+    to_ascii_key,
+    to_chosung,
+)
 from .enum import OrderBy
 
+# 검색 대상 필드를 이어붙인 문서. 이름은 공백을 제거한 형태로 들어감
+SEARCH_DOCUMENT_SQL = """
+coalesce(replace(biz_card->>'name', ' ', ''), '') || ' ' ||
+coalesce(biz_card->>'role', '') || ' ' ||
+coalesce(biz_card->>'email', '') || ' ' ||
+coalesce(biz_card->>'phone_number', '') || ' ' ||
+coalesce(biz_card#>>'{company,name}', '') || ' ' ||
+coalesce(biz_card#>>'{company,address}', '') || ' ' ||
+coalesce(biz_card#>>'{company,website}', '') || ' ' ||
+coalesce(biz_card#>>'{company,english_name}', '')
+""".strip()
+
+def build_search_key(biz_card: dict) -> str:
+    """ 
+    search_document 로 찾을 수 없는 형태의 검색어를 위한 키
+    - 이름/회사명 초성 (ㄱㅅㄷ)
+    - 숫자만 남긴 전화번호 (01012345678)
+    - 이메일 아이디 (영문/숫자만, 소문자)
+    """
+    company = biz_card.get("company") or {}
+    email = biz_card.get("email") or ""
+    tokens = [
+        to_chosung(biz_card.get("name") or ""),
+        to_chosung(company.get("name") or ""),
+        only_digits(biz_card.get("phone_number") or ""),
+        to_ascii_key(email.split("@")[0]),
+    ]
+    return " ".join(token for token in tokens if token)
+
+
 class Company(BaseModel):
     u_id: uuid.UUID = Field(default_factory=uuid.uuid4)
     name: str
@@ -28,6 +69,21 @@ class BusinessCard(BaseModel):
 
 class BizClient(SQLModel, table=True):
 
+    __table_args__ = (
+        Index(
+            "ix_bizclient_search_document_trgm",
+            "search_document",
+            postgresql_using="gin",
+            postgresql_ops={"search_document": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_bizclient_search_key_trgm",
+            "search_key",
+            postgresql_using="gin",
+            postgresql_ops={"search_key": "gin_trgm_ops"},
+        ),
+    )
+
     u_id: uuid.UUID = SQLModelField(default_factory=uuid.uuid4, primary_key=True)
     biz_card: dict = SQLModelField(sa_type=JSONB, nullable=False, description="The JSON value stored in the table")  # dict로 변경
     
@@ -38,38 +94,72 @@ class BizClient(SQLModel, table=True):
     created_at: int = SQLModelField(nullable=True, default_factory=lambda: int(datetime.now().timestamp()))
     updated_at: int = SQLModelField(nullable=True, default_factory=lambda: int(datetime.now().timestamp()))
 
+    # biz_card 로부터 DB 가 계산하는 검색용 컬럼 (직접 쓰지 않음)
+    search_document: str | None = SQLModelField(
+        default=None,
+        sa_column=Column(Text, Computed(SEARCH_DOCUMENT_SQL, persisted=True))
+    )
+    # 초성/전화번호/이메일 아이디 검색용 키. 쓰기 시점에 build_search_key 로 채움
+    search_key: str | None = SQLModelField(default=None, sa_type=Text)
+
     @classmethod
-    def get_by_id(cls, db: Session, u_id: uuid.UUID):
-        return db.exec(select(cls).where(cls.u_id == u_id)).first()
+    async def get_by_id(cls, db: AsyncSession, u_id: uuid.UUID):
+        return (await db.exec(select(cls).where(cls.u_id == u_id))).first()
 
     @classmethod
-    def get_all(cls, db: Session):
-        return db.exec(select(cls)).all()
+    async def get_all(cls, db: AsyncSession):
+        return (await db.exec(select(cls))).all()
     
     @classmethod
-    def filter(
+    async def filter(
         cls, 
-        db: Session,
+        db: AsyncSession,
         query: Optional[str] = None,
         order_by: OrderBy | None = None,
         offset: int = 0,
         limit: int = 10
     ):
-        stmt = select(cls).offset(offset).limit(limit)
+        stmt = cls._filter_stmt(query, order_by).offset(offset).limit(limit)
+        return (await db.exec(stmt)).all()
+
+    @classmethod
+    async def stream_filter(
+        cls,
+        db: AsyncSession,
+        query: Optional[str] = None,
+        order_by: OrderBy | None = None,
+    ) -> AsyncIterator["BizClient"]:
+        """ filter 와 같은 조건의 전체 결과를 서버 사이드 커서로 조금씩 읽어옴 """
+        stmt = cls._filter_stmt(query, order_by)
+        result = await db.stream_scalars(stmt.execution_options(yield_per=settings.STREAM_YIELD_PER))
+        async for client in result:
+            yield client
+
+    @classmethod
+    def _filter_stmt(
+        cls,
+        query: Optional[str] = None,
+        order_by: OrderBy | None = None,
+    ):
+        stmt = select(cls)
 
         if query:
-            stmt = stmt.where(
-                or_(
-                    func.replace(cls.biz_card["name"].astext, ' ', '').ilike(f"%{query}%"),  # 공백 제거 후 검색
-                    cls.biz_card["role"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["email"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["company"]["name"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["company"]["address"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["company"]["website"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["company"]["english_name"].astext.ilike(f"%{query}%"),
-                    cls.biz_card["phone_number"].astext.ilike(f"%{query}%")
-                )
-            )
+            conditions = [cls.search_document.ilike(f"%{escape_like(query)}%")] # type: ignore
+
+            compact = "".join(query.split())
+            if is_chosung(compact):
+                conditions.append(cls.search_key.like(f"%{compact}%")) # type: ignore
+            
+            digits = only_digits(query)
+            if is_phone_like(query) and len(digits) >= 3:
+                conditions.append(cls.search_key.like(f"%{digits}%")) # type: ignore
+
+            # kimsd 로 kim.sd@... 를 찾음 (search_document 의 이메일에는 구분자가 남아 있음)
+            key = to_ascii_key(query)
+            if is_ascii_word(query) and len(key) >= 3:
+                conditions.append(cls.search_key.like(f"%{key}%")) # type: ignore
+
+            stmt = stmt.where(or_(*conditions))
 
         # 정렬 조건 설정
         if order_by == OrderBy.CREATED:
@@ -77,44 +167,57 @@ class BizClient(SQLModel, table=True):
         else:  # 기본 정렬: updated_at
             stmt = stmt.order_by(desc(cls.updated_at)) # type: ignore
 
-        stmt = stmt.offset(offset).limit(limit)
-        return db.exec(stmt).all()
+        return stmt
 
     @classmethod
-    def update_bizcard(
+    async def update_bizcard(
         cls, 
-        db: Session, 
+        db: AsyncSession, 
         u_id: uuid.UUID, 
         biz_card: BusinessCard
-    ):
-        stmt = select(cls).where(cls.u_id == u_id)
-        biz_client = db.exec(stmt).first()
-
-        if not biz_client:
-            return False
-        
+    ) -> "BizClient | None":
+        """ 수정된 행을 반환 (없는 u_id 면 None) """
         update_stmt = (
             update(cls)
             .where(cls.u_id == u_id) # type: ignore
             .values(
                 biz_card=biz_card.model_dump(mode="json"),
+                search_key=build_search_key(biz_card.model_dump(mode="json")),
                 updated_at=int(datetime.now().timestamp())
             )
+            .returning(cls)
         )
 
         try:
-            rows = db.exec(update_stmt) # type: ignore
-            db.commit()
-
-            if rows.rowcount == 0:
-                return False
-            
-            return True
+            biz_client = (await db.exec(update_stmt)).scalars().first() # type: ignore
+            await db.commit()
+            return biz_client
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise e
         
-    
+    @classmethod
+    async def backfill_search_keys(cls, db: AsyncSession, batch_size: int = 500) -> int:
+        """ search_key 가 비어있는 (외부에서 들어온) 행을 채움 """
+        count = 0
+        while True:
+            stmt = select(cls).where(cls.search_key == None).limit(batch_size) # type: ignore
+            rows = (await db.exec(stmt)).all()
+            if not rows:
+                return count
+            
+            for row in rows:
+                row.search_key = build_search_key(row.biz_card)
+                db.add(row)
+            await db.commit()
+            count += len(rows)
+
+
+@event.listens_for(BizClient, "before_insert")
+@event.listens_for(BizClient, "before_update")
+def _set_search_key(mapper, connection, target: BizClient):
+    target.search_key = build_search_key(target.biz_card)
+
 
 class BizClientDTO(BaseModel):
     
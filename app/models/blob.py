@@ -0,0 +1,246 @@
+import uuid
+from datetime import datetime
+from typing import Iterable
+from sqlmodel import SQLModel, Field as SQLModelField, update, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import BigInteger, Integer, cast, func, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from .bizcard import BizClient
+from .dashboard import Project, stats_cache
+
+
+class BlobDeleteJob(SQLModel, table=True):
+    """
+    지울 blob 목록 (DB 에 남으므로 재시작해도 유실되지 않음).
+    워커가 묶음으로 가져가 지우고, 실패하면 run_after 까지 기다렸다 다시 시도함
+    """
+    name: str = SQLModelField(primary_key=True)  # 저장소의 blob 이름
+    attempts: int = SQLModelField(default=0)
+    run_after: int = SQLModelField(default_factory=lambda: int(datetime.now().timestamp()), index=True)
+
+    created_at: int = SQLModelField(default_factory=lambda: int(datetime.now().timestamp()))
+
+    @classmethod
+    def _enqueue_stmt(cls, names: Iterable[str]):
+        now = int(datetime.now().timestamp())
+        values = [{"name": name, "run_after": now, "created_at": now} for name in names]
+        return pg_insert(cls).values(values).on_conflict_do_nothing(index_elements=[cls.name])
+
+    @classmethod
+    async def enqueue(cls, db: AsyncSession, names: list[str]) -> None:
+        if not names:
+            return
+        await db.exec(cls._enqueue_stmt(names)) # type: ignore
+        await db.commit()
+
+    @classmethod
+    async def claim(cls, db: AsyncSession, limit: int) -> list[str]:
+        """
+        실행할 때가 된 작업을 limit 개까지 가져감.
+        다른 워커와 겹치지 않도록 SKIP LOCKED 로 고르고, 가져가는 동시에 run_after 를 재시도 시각으로 미뤄 둠
+        (처리 중 죽어도 그 시각이 지나면 다시 잡힘)
+        """
+        now = int(datetime.now().timestamp())
+        ready = (
+            select(cls.name)
+            .where(cls.run_after <= now, cls.attempts < settings.BLOB_DELETE_MAX_ATTEMPTS) # type: ignore
+            .order_by(cls.run_after) # type: ignore
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        backoff = func.least(
+            settings.BLOB_DELETE_RETRY_SECONDS * func.power(2, cls.attempts),
+            settings.BLOB_DELETE_RETRY_MAX_SECONDS
+        )
+        stmt = (
+            update(cls)
+            .where(cls.name.in_(ready.scalar_subquery())) # type: ignore
+            .values(attempts=cls.attempts + 1, run_after=now + cast(backoff, Integer))
+            .returning(cls.name) # type: ignore
+        )
+        names = (await db.exec(stmt)).scalars().all() # type: ignore
+        await db.commit()
+        return list(names)
+
+    @classmethod
+    async def complete(cls, db: AsyncSession, names: list[str]) -> None:
+        if not names:
+            return
+        await db.exec(delete(cls).where(cls.name.in_(names))) # type: ignore
+        await db.commit()
+
+    @classmethod
+    async def enqueue_orphans(cls, db: AsyncSession, names: list[str]) -> list[str]:
+        """ names 중 Project / BizClient / StoredBlob 어디에서도 참조하지 않는 것을 삭제 대기열에 넣음 """
+        if not names:
+            return []
+        referenced = union(
+            select(Project.file_name).where(Project.file_name.in_(names)), # type: ignore
+            select(BizClient.blob_file_name).where(BizClient.blob_file_name.in_(names)), # type: ignore
+            select(StoredBlob.name).where(StoredBlob.name.in_(names)), # type: ignore
+        )
+        found = set((await db.exec(referenced)).scalars().all()) # type: ignore
+        orphans = [name for name in names if name not in found]
+        await cls.enqueue(db, orphans)
+        return orphans
+
+
+class StoredBlob(SQLModel, table=True):
+    """
+    내용(sha256)이 같은 첨부파일은 blob 하나를 공유하고 참조 수로 관리함.
+    name 은 행마다 새로 정하므로, 마지막 참조가 사라져 지우는 중인 blob 과 새로 올리는 blob 이 겹치지 않음
+    """
+    sha256: str = SQLModelField(primary_key=True)
+    name: str = SQLModelField(unique=True)  # 저장소의 blob 이름
+    size: int = SQLModelField(sa_type=BigInteger)
+    ref_count: int = SQLModelField(default=1)
+
+    created_at: int = SQLModelField(default_factory=lambda: int(datetime.now().timestamp()))
+
+    @classmethod
+    async def _acquire(cls, db: AsyncSession, sha256: str) -> str | None:
+        """ 같은 내용이 이미 있으면 참조 수를 올리고 blob 이름을 반환 (commit 하지 않음) """
+        stmt = (
+            update(cls)
+            .where(cls.sha256 == sha256) # type: ignore
+            .values(ref_count=cls.ref_count + 1)
+            .returning(cls.name) # type: ignore
+        )
+        return (await db.exec(stmt)).scalar_one_or_none() # type: ignore
+
+    @classmethod
+    async def _register(cls, db: AsyncSession, sha256: str, name: str, size: int) -> str:
+        """
+        새로 올린 blob 을 등록 (commit 하지 않음). 같은 내용이 동시에 먼저 등록됐으면 그쪽 참조 수를 올리고 그 이름을 반환
+        """
+        stmt = pg_insert(cls).values(sha256=sha256, name=name, size=size, ref_count=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.sha256],
+            set_={"ref_count": cls.ref_count + 1}
+        ).returning(cls.name) # type: ignore
+        return (await db.exec(stmt)).scalar_one() # type: ignore
+
+    @classmethod
+    async def _put_project_file(
+        cls,
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        file_id: uuid.UUID | None,
+        name: str | None,
+        original_file_name: str | None
+    ) -> None:
+        """ 프로젝트의 첨부파일을 바꾸고 이전 blob 의 참조를 반납 (commit 하지 않음) """
+        previous = await Project.put_file(db, project_id, file_id, name, original_file_name)
+        if previous:
+            await cls._release(db, previous)
+
+    @classmethod
+    async def attach_existing(
+        cls,
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        sha256: str,
+        file_id: uuid.UUID,
+        original_file_name: str
+    ) -> str | None:
+        """
+        같은 내용의 blob 이 이미 있으면 참조를 하나 올려 프로젝트에 붙이고 그 이름을 반환 (없으면 None).
+        참조 수와 프로젝트 변경을 한 트랜잭션으로 처리하므로 프로젝트가 그 사이 지워졌어도 참조가 남지 않음
+        """
+        try:
+            name = await cls._acquire(db, sha256)
+            if name is not None:
+                await cls._put_project_file(db, project_id, file_id, name, original_file_name)
+            await db.commit()
+            return name
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @classmethod
+    async def attach_new(
+        cls,
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        sha256: str,
+        name: str,
+        size: int,
+        file_id: uuid.UUID,
+        original_file_name: str
+    ) -> str:
+        """
+        새로 올린 blob 을 등록하고 프로젝트에 붙인 뒤 실제로 쓰게 된 blob 이름을 반환.
+        같은 내용이 동시에 먼저 등록됐거나 프로젝트가 그 사이 지워졌으면 방금 올린 blob 은 삭제 대기열에 넣음
+        """
+        try:
+            registered = await cls._register(db, sha256, name, size)
+            if registered != name:
+                await db.exec(BlobDeleteJob._enqueue_stmt([name])) # type: ignore
+            await cls._put_project_file(db, project_id, file_id, registered, original_file_name)
+            await db.commit()
+            return registered
+        except Exception as e:
+            await db.rollback()
+            await BlobDeleteJob.enqueue(db, [name])
+            raise e
+
+    @classmethod
+    async def _release(cls, db: AsyncSession, name: str) -> bool:
+        """
+        참조 하나를 반납 (commit 하지 않음). 마지막 참조였거나 이 테이블 이전에 올린 파일이면 
+        같은 트랜잭션에서 BlobDeleteJob 에 넣고 True
+        """
+        stmt = (
+            update(cls)
+            .where(cls.name == name) # type: ignore
+            .values(ref_count=cls.ref_count - 1)
+            .returning(cls.ref_count) # type: ignore
+        )
+        ref_count = (await db.exec(stmt)).scalar_one_or_none() # type: ignore
+        if ref_count is None:
+            await db.exec(BlobDeleteJob._enqueue_stmt([name])) # type: ignore
+            return True
+
+        if ref_count <= 0:
+            # 그 사이 acquire 로 다시 참조됐으면 지우지 않음
+            stmt = (
+                delete(cls)
+                .where(cls.name == name, cls.ref_count <= 0) # type: ignore
+                .returning(cls.name) # type: ignore
+            )
+            deleted = (await db.exec(stmt)).scalar_one_or_none() # type: ignore
+            if deleted is not None:
+                await db.exec(BlobDeleteJob._enqueue_stmt([name])) # type: ignore
+            return deleted is not None
+
+        return False
+
+    @classmethod
+    async def detach(cls, db: AsyncSession, project_id: uuid.UUID) -> None:
+        """ 프로젝트의 첨부파일을 떼고 참조를 반납하는 것까지 한 트랜잭션으로 처리 """
+        try:
+            await cls._put_project_file(db, project_id, None, None, None)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @classmethod
+    async def delete_project(cls, db: AsyncSession, project_id: uuid.UUID) -> bool:
+        """
+        프로젝트 삭제, 첨부파일 참조 반납, blob 삭제 대기열 추가를 한 트랜잭션으로 처리.
+        blob 은 마지막 참조일 때만 대기열에 들어가고 백그라운드 워커가 지움
+        """
+        try:
+            project = await Project.delete(db, project_id)
+            if project is not None and project.file_name:
+                await cls._release(db, project.file_name)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        stats_cache.clear()
+        return project is not None
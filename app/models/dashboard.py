@@ -1,18 +1,25 @@
+import base64
 import uuid
 from datetime import timedelta
-from typing import List
+from typing import AsyncIterator, Dict, List
 from sqlmodel import (
     SQLModel, 
     Field, 
-    Session, 
     update, 
     insert,
     select,
     delete
 )
-from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Float, Index, case, cast, func, literal, literal_column, or_, tuple_
+from sqlalchemy.orm import aliased
+from pydantic import BaseModel, Field as PydanticField
 from datetime import datetime
 
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.text import escape_like
 from .enum import (
     ProjectPriority,
     ProjectCategory,
@@ -21,6 +28,63 @@ from .enum import (
 
 
 
+def week_range() -> tuple[int, int]:
+    """ 이번 주 (월요일 0시 ~ 일요일 23:59:59) """
+    start_of_week = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_of_week = start_of_week - timedelta(days=start_of_week.weekday())
+    end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
+    return int(start_of_week.timestamp()), int(end_of_week.timestamp())
+
+
+def month_range() -> tuple[int, int]:
+    """ 이번 달 (1일 0시 ~ 말일 23:59:59) """
+    start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month = start_of_month.replace(day=28) + timedelta(days=4)
+    start_of_next_month = next_month.replace(day=1)
+    end_of_month = start_of_next_month - timedelta(seconds=1)
+    return int(start_of_month.timestamp()), int(end_of_month.timestamp())
+
+
+def encode_cursor(created_at: int, u_id: uuid.UUID) -> str:
+    """ (created_at, u_id) 를 외부에 노출할 불투명한 커서 문자열로 변환 """
+    raw = f"{created_at}:{u_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, uuid.UUID]:
+    """ 잘못된 커서는 ValueError """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, u_id = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        return int(created_at), uuid.UUID(u_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class ProjectStats(BaseModel):
+    total: int = 0
+    by_category: Dict[ProjectCategory, int] = PydanticField(
+        default_factory=lambda: {category: 0 for category in ProjectCategory}
+    )
+    by_priority: Dict[ProjectPriority, int] = PydanticField(
+        default_factory=lambda: {priority: 0 for priority in ProjectPriority}
+    )
+    due_this_week: int = 0
+    due_this_month: int = 0
+
+
+# pg_trgm 이 인덱스로 찾을 수 있는 검색어의 최소 길이
+TRIGRAM_MIN_LENGTH = 3
+
+
+# 대시보드 첫 화면용 집계 캐시. Project 가 바뀌면 비우고, 주/월이 바뀌면 key 가 달라짐
+stats_cache: TTLCache[tuple[int, int], ProjectStats] = TTLCache(
+    maxsize=4,
+    ttl=settings.DASHBOARD_STATS_TTL_SECONDS
+)
+metrics.register("dashboard_stats_cache", stats_cache.stats)
+
+
 class ProjectDTO(BaseModel):
     u_id: uuid.UUID = Field(default_factory=uuid.uuid4)
 
@@ -41,6 +105,12 @@ class ProjectDTO(BaseModel):
 
 
 class Project(SQLModel, table=True):
+
+    # 목록 조회(created_at desc, u_id desc)와 keyset 페이지네이션용
+    __table_args__ = (
+        Index("ix_project_created_at_u_id", "created_at", "u_id"),
+    )
+
     u_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     title: str | None = Field(default="")
@@ -75,33 +145,46 @@ class Project(SQLModel, table=True):
         return (progress / total) * 100
     
     @classmethod
-    def get_all(
+    async def get_all(
         cls,
-        db: Session
+        db: AsyncSession
     ) -> List["Project"]:
         stmt = select(cls)
-        return db.exec(stmt).all() # type: ignore
+        return (await db.exec(stmt)).all() # type: ignore
 
 
     @classmethod
-    def get_one(
+    async def get_one(
         cls,
-        db: Session,
+        db: AsyncSession,
         u_id: uuid.UUID
     ) -> "Project":
         stmt = select(cls).where(cls.u_id == u_id)
-        return db.exec(stmt).first() # type: ignore
+        return (await db.exec(stmt)).first() # type: ignore
 
 
     @classmethod
-    def put_file(
+    async def put_file(
         cls,
-        db: Session,
+        db: AsyncSession,
         u_id: uuid.UUID,
         file_id: uuid.UUID | None,
         file_name: str | None,
         original_file_name: str | None
-    ):
+    ) -> str | None:
+        """
+        첨부파일을 바꾸고 이전 file_name 을 반환. commit 하지 않으므로 blob 참조 수 변경과 같은 트랜잭션에서 씀.
+        행을 잠가서 동시에 바뀐 이전 파일을 놓치지 않음
+        """
+        stmt = (
+            select(cls.u_id, cls.file_name)
+            .where(cls.u_id == u_id) # type: ignore
+            .with_for_update()
+        )
+        row = (await db.exec(stmt)).first() # type: ignore
+        if row is None:
+            raise ValueError("No rows were updated")
+
         stmt = (
             update(cls)
             .where(cls.u_id == u_id) # type: ignore
@@ -110,56 +193,199 @@ class Project(SQLModel, table=True):
                 file_name=file_name,
                 original_file_name=original_file_name
             )
-        )        
-
-        result = db.exec(stmt) # type: ignore
-        if result.rowcount == 0:
-            db.rollback()  # 롤백
-            raise ValueError("No rows were updated")
-        else:
-            db.commit()  # 커밋
+        )
+        await db.exec(stmt) # type: ignore
+        return row.file_name
 
     @classmethod
-    def filter(
+    async def filter(
         cls,
-        db: Session,
+        db: AsyncSession,
         category: ProjectCategory | None,
         priority: ProjectPriority | None,
         query: str | None,
         date_filter: ProjectDateFilter | None,
         offset: int,
-        limit: int
+        limit: int,
+        cursor: str | None = None,
     ) -> List["Project"]:
+        """ 
+        cursor 가 주어지면 offset 대신 cursor 이후의 행부터 조회 (keyset)
+        3 글자 이상의 query 가 있고 cursor 가 없으면 최근 후보 PROJECT_SEARCH_RANK_CANDIDATES 개를 검색어와의 유사도 순으로 정렬하고,
+        그 뒤의 페이지는 후보 밖의 행을 created_at 순으로 이어 붙임
+        """
     
-        stmt = select(cls)
+        stmt = cls._apply_filters(select(cls), category, priority, query, date_filter)
         
+        if cursor:
+            created_at, u_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(cls.created_at, cls.u_id) < (created_at, u_id))
+        elif query and cls.ranks_search(query):
+            return await cls._ranked_page(db, stmt, query, offset, limit)
+        else:
+            stmt = stmt.offset(offset)
+
+        stmt = stmt.limit(limit).order_by(cls.created_at.desc(), cls.u_id.desc()) # type: ignore
+        
+        return (await db.exec(stmt)).all() # type: ignore
+
+    @staticmethod
+    def ranks_search(query: str) -> bool:
+        """ 
+        trigram 은 3 글자보다 짧은 검색어를 인덱스로 찾지 못해 흔한 두 글자 검색어도 많은 행이 후보가 되므로,
+        짧은 검색어는 순위를 매기지 않고 created_at 순으로 앞에서부터 찾다가 멈춤
+        """
+        return len(query.strip()) >= TRIGRAM_MIN_LENGTH
+
+    @classmethod
+    async def _ranked_page(cls, db: AsyncSession, stmt, query: str, offset: int, limit: int) -> List["Project"]:
+        """
+        일치하는 행 중 최근 PROJECT_SEARCH_RANK_CANDIDATES 개를 유사도 순으로, 그 이후는 created_at 순으로 offset 페이지를 만듦.
+        후보 집합이 offset 과 상관없이 같으므로 페이지끼리 겹치거나 빠지는 행이 없음
+        """
+        window = settings.PROJECT_SEARCH_RANK_CANDIDATES
+        projects: List["Project"] = []
+
+        if offset < window:
+            # 흔한 검색어는 거의 모든 행이 일치하므로 전체의 유사도를 계산하지 않고
+            # created_at 인덱스로 최근 후보만 가져와 그 안에서 순위를 매김
+            candidates = (
+                stmt.add_columns(func.word_similarity(query, cls.search_document()).label("rank"))
+                .order_by(cls.created_at.desc(), cls.u_id.desc()) # type: ignore
+                .limit(window)
+                .subquery()
+            )
+            ranked = aliased(cls, candidates)
+            ranked_stmt = (
+                select(ranked)
+                .order_by(candidates.c.rank.desc(), ranked.created_at.desc(), ranked.u_id.desc()) # type: ignore
+                .offset(offset)
+                .limit(min(limit, window - offset))
+            )
+            projects.extend((await db.exec(ranked_stmt)).all()) # type: ignore
+
+        remaining = limit - len(projects)
+        if remaining > 0 and offset + limit > window:
+            rest_stmt = (
+                stmt.order_by(cls.created_at.desc(), cls.u_id.desc()) # type: ignore
+                .offset(max(offset, window))
+                .limit(remaining)
+            )
+            projects.extend((await db.exec(rest_stmt)).all()) # type: ignore
+        return projects
+
+    @classmethod
+    async def stream_filter(
+        cls,
+        db: AsyncSession,
+        category: ProjectCategory | None,
+        priority: ProjectPriority | None,
+        query: str | None,
+        date_filter: ProjectDateFilter | None,
+    ) -> AsyncIterator["Project"]:
+        """ filter 와 같은 조건의 전체 결과를 서버 사이드 커서로 조금씩 읽어옴 """
+        stmt = cls._apply_filters(select(cls), category, priority, query, date_filter)
+        stmt = (
+            stmt.order_by(cls.created_at.desc(), cls.u_id.desc()) # type: ignore
+            .execution_options(yield_per=settings.STREAM_YIELD_PER)
+        )
+
+        result = await db.stream_scalars(stmt)
+        async for project in result:
+            yield project
+
+    @classmethod
+    def _apply_filters(
+        cls,
+        stmt,
+        category: ProjectCategory | None,
+        priority: ProjectPriority | None,
+        query: str | None,
+        date_filter: ProjectDateFilter | None,
+    ):
         if category:
             stmt = stmt.where(cls.category == category)
         if priority:
             stmt = stmt.where(cls.priority == priority)
         if query:
-            stmt = stmt.where(cls.title.like(f"%{query}%") | cls.summary.like(f"%{query}%")) # type: ignore
+            document = cls.search_document()
+            stmt = stmt.where(document.ilike(f"%{escape_like(query)}%"))
         if date_filter:
             if date_filter == ProjectDateFilter.WEEK:
-                start_of_week = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                start_of_week = start_of_week - timedelta(days=start_of_week.weekday())
-                end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
-                stmt = stmt.where(cls.end_date.between(int(start_of_week.timestamp()), int(end_of_week.timestamp()))) # type: ignore
+                stmt = stmt.where(cls.end_date.between(*week_range())) # type: ignore
             elif date_filter == ProjectDateFilter.MONTH:
-                start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                next_month = start_of_month.replace(day=28) + timedelta(days=4)
-                start_of_next_month = next_month.replace(day=1)
-                end_of_month = start_of_next_month - timedelta(seconds=1)
-                stmt = stmt.where(cls.end_date.between(int(start_of_month.timestamp()), int(end_of_month.timestamp()))) # type: ignore
-        
-        stmt = stmt.offset(offset).limit(limit).order_by(cls.created_at.desc()) # type: ignore
-        
-        return db.exec(stmt).all() # type: ignore
+                stmt = stmt.where(cls.end_date.between(*month_range())) # type: ignore
+        return stmt
+
+    @classmethod
+    def progress_expr(cls, now: int):
+        """ Project.progress 와 같은 계산을 SQL 로 """
+        total = cls.end_date - cls.start_date
+        return cast(
+            case(
+                (or_(cls.end_date < now, total == 0), literal(100.0)),
+                else_=(literal(now) - cls.start_date) * 100.0 / total,
+            ),
+            Float,
+        )
+
+    @classmethod
+    async def get_progress(
+        cls,
+        db: AsyncSession,
+        category: ProjectCategory | None = None,
+        priority: ProjectPriority | None = None,
+        query: str | None = None,
+        date_filter: ProjectDateFilter | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ):
+        """ 진행률 화면에 필요한 컬럼만 조회 (content 등은 읽지 않음) """
+        stmt = cls._progress_stmt(category, priority, query, date_filter).offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return (await db.exec(stmt)).all() # type: ignore
+
+    @classmethod
+    async def stream_progress(
+        cls,
+        db: AsyncSession,
+        category: ProjectCategory | None = None,
+        priority: ProjectPriority | None = None,
+        query: str | None = None,
+        date_filter: ProjectDateFilter | None = None,
+    ):
+        stmt = cls._progress_stmt(category, priority, query, date_filter)
+        result = await db.stream(stmt.execution_options(yield_per=settings.STREAM_YIELD_PER))
+        async for row in result:
+            yield row
 
     @classmethod
-    def put(
+    def _progress_stmt(
+        cls,
+        category: ProjectCategory | None,
+        priority: ProjectPriority | None,
+        query: str | None,
+        date_filter: ProjectDateFilter | None,
+    ):
+        now = int(datetime.now().timestamp())
+        stmt = select(
+            cls.u_id,
+            cls.title,
+            cls.priority,
+            cls.category,
+            cls.start_date,
+            cls.end_date,
+            cls.progress_expr(now).label("progress"),
+        )
+        stmt = cls._apply_filters(stmt, category, priority, query, date_filter)
+        return stmt.order_by(cls.created_at.desc(), cls.u_id.desc()) # type: ignore
+
+    @classmethod
+    async def put(
         cls,        
-        db: Session,         
+        db: AsyncSession,         
         title: str,
         summary: str,
         content: str | None,
@@ -169,8 +395,11 @@ class Project(SQLModel, table=True):
         end_date: int,
         u_id: uuid.UUID | None = None,
 
-    ):
-        """ data 는 무조건 아래와 같은 필드를 가져야함 """
+    ) -> "Project | None":
+        """ 
+        data 는 무조건 아래와 같은 필드를 가져야함.
+        u_id 가 없으면 새로 만들고, 있으면 수정. 저장된 행을 반환 (수정할 행이 없으면 None)
+        """
 
         if u_id is None:
             # insert
@@ -205,26 +434,90 @@ class Project(SQLModel, table=True):
             )
 
         try:
-            db.exec(stmt) # type: ignore
-            db.commit()
+            project = (await db.exec(stmt.returning(cls))).scalars().first() # type: ignore
+            await db.commit()
         except Exception as e:
             raise e
         
+        stats_cache.clear()
+        return project
 
     @classmethod
-    def delete(
+    async def delete(
         cls,
-        db: Session,
+        db: AsyncSession,
         u_id: uuid.UUID
-    ):
+    ) -> "Project | None":
+        """ 삭제한 행을 반환 (없으면 None). commit 하지 않으므로 blob 참조 반납과 같은 트랜잭션에서 씀 """
         stmt = (
             delete(cls)
             .where(cls.u_id == u_id) # type: ignore
+            .returning(cls)
         )
-        try:
-            db.exec(stmt) # type: ignore
-            db.commit()
-        except Exception as e:
-            raise e
-        
-        return True
+        return (await db.exec(stmt)).scalar_one_or_none() # type: ignore
+
+    @classmethod
+    async def stats(cls, db: AsyncSession) -> ProjectStats:
+        """ 카테고리/우선순위별 개수와 이번 주/달 마감 개수를 한 번의 GROUP BY 로 집계 """
+        week_start, week_end = week_range()
+        month_start, month_end = month_range()
+
+        key = (week_start, month_start)
+        cached = stats_cache.get(key)
+        if cached is not None:
+            return cached
+
+        stmt = (
+            select(
+                cls.category,
+                cls.priority,
+                func.count().label("count"),
+                func.count().filter(cls.end_date.between(week_start, week_end)).label("due_this_week"), # type: ignore
+                func.count().filter(cls.end_date.between(month_start, month_end)).label("due_this_month"), # type: ignore
+            )
+            .group_by(cls.category, cls.priority)
+        )
+
+        stats = ProjectStats()
+        for row in (await db.exec(stmt)).all(): # type: ignore
+            stats.total += row.count
+            stats.by_category[row.category] += row.count
+            stats.by_priority[row.priority] += row.count
+            stats.due_this_week += row.due_this_week
+            stats.due_this_month += row.due_this_month
+
+        stats_cache.set(key, stats)
+        return stats
+
+    @staticmethod
+    def next_cursor(projects: List["Project"], limit: int) -> str | None:
+        """ 페이지가 꽉 찼을 때만 다음 페이지 커서를 반환 """
+        if not projects or len(projects) < limit:
+            return None
+        last = projects[-1]
+        return encode_cursor(last.created_at, last.u_id)
+
+    @classmethod
+    def search_document(cls):
+        """ 
+        검색 대상(title, summary, content)을 하나로 이은 표현식. 
+        ix_project_search_trgm 인덱스의 표현식과 같아야 인덱스를 탐 
+        """
+        sep = literal_column("' '")
+        empty = literal_column("''")
+        return (
+            func.coalesce(cls.title, empty) + sep 
+            + func.coalesce(cls.summary, empty) + sep 
+            + func.coalesce(cls.content, empty)
+        )
+
+
+# 검색어 부분일치(ILIKE '%q%')를 위한 trigram 인덱스 (pg_trgm 필요)
+Project.__table__.append_constraint( # type: ignore
+    Index(
+        "ix_project_search_trgm",
+        Project.search_document().label("search_document"),
+        postgresql_using="gin",
+        postgresql_ops={"search_document": "gin_trgm_ops"},
+    )
+)
@@ -42,4 +42,9 @@ class Role(enum.Enum):
 
 class OrderBy(enum.Enum):
     CREATED = "created_at"
-    UPDATED = "updated_at"
\ No newline at end of file
+    UPDATED = "updated_at"
+class JobStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -0,0 +1,212 @@
+import uuid
+from datetime import datetime, timedelta
+from pydantic import BaseModel
+from sqlmodel import SQLModel, Field as SQLModelField, select, update, or_, and_, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Index
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from .enum import JobStatus
+
+
+class ProjectJobDTO(BaseModel):
+    u_id: uuid.UUID
+    status: JobStatus
+    error: str | None
+    # 성공하면 만들어진 프로젝트
+    project_id: uuid.UUID | None
+
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    # 대기열에서 기다린 시간, 실행 시간 (ms)
+    wait_ms: int | None
+    run_ms: int | None
+
+
+class ProjectJob(SQLModel, table=True):
+    """
+    LLM 으로 프로젝트를 만드는 비동기 작업.
+    DB 에 두므로 어느 워커 프로세스에서든 상태를 조회할 수 있고, 재시작해도 대기 중인 작업이 남음
+    """
+
+    __table_args__ = (
+        Index("ix_projectjob_status_created_at", "status", "created_at"),
+        Index("ux_projectjob_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+
+    u_id: uuid.UUID = SQLModelField(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = SQLModelField(foreign_key="user.u_id", nullable=False)
+
+    query: str
+    parent_id: uuid.UUID | None = SQLModelField(default=None)
+    # 클라이언트가 보낸 Idempotency-Key. 같은 유저가 같은 key 로 다시 요청하면 새 작업을 만들지 않음
+    idempotency_key: str | None = SQLModelField(default=None)
+
+    status: JobStatus = SQLModelField(default=JobStatus.QUEUED)
+    project_id: uuid.UUID | None = SQLModelField(default=None)
+    attempts: int = SQLModelField(default=0)
+    error: str | None = SQLModelField(default=None)
+
+    created_at: datetime = SQLModelField(default_factory=datetime.now)
+    started_at: datetime | None = SQLModelField(default=None)
+    finished_at: datetime | None = SQLModelField(default=None)
+    # LLM 호출이 밀려 다시 대기열에 넣은 작업은 이 시각 이후에 가져감
+    available_at: datetime | None = SQLModelField(default=None)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dto(self) -> ProjectJobDTO:
+        wait_ms = run_ms = None
+        if self.started_at:
+            wait_ms = int((self.started_at - self.created_at).total_seconds() * 1000)
+            if self.finished_at:
+                run_ms = int((self.finished_at - self.started_at).total_seconds() * 1000)
+        return ProjectJobDTO(
+            u_id=self.u_id,
+            status=self.status,
+            error=self.error,
+            project_id=self.project_id,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            wait_ms=wait_ms,
+            run_ms=run_ms,
+        )
+
+    @classmethod
+    async def create(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        query: str,
+        parent_id: uuid.UUID | None = None,
+        idempotency_key: str | None = None
+    ) -> "ProjectJob":
+        """ idempotency_key 로 이미 만든 작업이 있으면 그 작업을 반환 """
+        if idempotency_key is not None:
+            existing = await cls._get_by_idempotency_key(db, user_id, idempotency_key)
+            if existing is not None:
+                return existing
+
+        job = cls(user_id=user_id, query=query, parent_id=parent_id, idempotency_key=idempotency_key)
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 같은 key 의 요청이 동시에 먼저 만들었음
+            await db.rollback()
+            if idempotency_key is None:
+                raise
+            existing = await cls._get_by_idempotency_key(db, user_id, idempotency_key)
+            if existing is None:
+                raise
+            return existing
+        return job
+
+    @classmethod
+    async def _get_by_idempotency_key(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        idempotency_key: str
+    ) -> "ProjectJob | None":
+        stmt = select(cls).where(cls.user_id == user_id, cls.idempotency_key == idempotency_key)
+        return (await db.exec(stmt)).first()
+
+    @classmethod
+    async def get(cls, db: AsyncSession, u_id: uuid.UUID, user_id: uuid.UUID) -> "ProjectJob | None":
+        stmt = (
+            select(cls)
+            .where(cls.u_id == u_id, cls.user_id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        return (await db.exec(stmt)).first()
+
+    @classmethod
+    async def claim(cls, db: AsyncSession) -> "ProjectJob | None":
+        """
+        가장 오래 기다린 작업 하나를 RUNNING 으로 바꿔 가져감 (다른 워커와 겹치지 않게 SKIP LOCKED).
+        실행 중 프로세스가 죽어 RUNNING 으로 남은 작업은 제한 시간의 두 배가 지나면 다시 가져가고,
+        시도 횟수를 다 쓴 작업은 같은 트랜잭션에서 FAILED 로 마감함
+        """
+        now = datetime.now()
+        stale = now - timedelta(seconds=settings.PROJECT_JOB_TIMEOUT_SECONDS * 2)
+        exhausted = (
+            update(cls)
+            .where(
+                cls.status == JobStatus.RUNNING,
+                cls.started_at < stale, # type: ignore
+                cls.attempts >= settings.PROJECT_JOB_MAX_ATTEMPTS
+            )
+            .values(status=JobStatus.FAILED, error="실행 중 중단된 채로 시도 횟수를 모두 썼습니다.", finished_at=now)
+        )
+        await db.exec(exhausted) # type: ignore
+
+        ready = (
+            select(cls.u_id)
+            .where(
+                cls.attempts < settings.PROJECT_JOB_MAX_ATTEMPTS,
+                or_(
+                    and_(
+                        cls.status == JobStatus.QUEUED,
+                        or_(cls.available_at == None, cls.available_at <= now) # type: ignore
+                    ),
+                    and_(cls.status == JobStatus.RUNNING, cls.started_at < stale) # type: ignore
+                )
+            )
+            .order_by(cls.created_at) # type: ignore
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(cls)
+            .where(cls.u_id.in_(ready.scalar_subquery())) # type: ignore
+            .values(status=JobStatus.RUNNING, started_at=now, attempts=cls.attempts + 1)
+            .returning(cls)
+        )
+        job = (await db.exec(stmt)).scalars().first() # type: ignore
+        await db.commit()
+        return job
+
+    @classmethod
+    async def requeue(cls, db: AsyncSession, u_id: uuid.UUID, delay: float) -> None:
+        """ 실행하지 못한 작업을 delay 초 뒤에 다시 가져가도록 대기열로 돌림. claim 에서 올린 시도 횟수는 되돌림 """
+        stmt = (
+            update(cls)
+            .where(cls.u_id == u_id, cls.status == JobStatus.RUNNING) # type: ignore
+            .values(
+                status=JobStatus.QUEUED,
+                started_at=None,
+                attempts=func.greatest(cls.attempts - 1, 0),
+                available_at=datetime.now() + timedelta(seconds=delay),
+            )
+        )
+        await db.exec(stmt) # type: ignore
+        await db.commit()
+
+    @classmethod
+    async def finish(
+        cls,
+        db: AsyncSession,
+        u_id: uuid.UUID,
+        status: JobStatus,
+        error: str | None = None,
+        project_id: uuid.UUID | None = None
+    ) -> None:
+        stmt = (
+            update(cls)
+            .where(cls.u_id == u_id) # type: ignore
+            .values(status=status, error=error, project_id=project_id, finished_at=datetime.now())
+        )
+        await db.exec(stmt) # type: ignore
+        await db.commit()
+
+    @classmethod
+    async def queue_depth(cls, db: AsyncSession) -> int:
+        stmt = select(func.count()).select_from(cls).where(cls.status == JobStatus.QUEUED)
+        return (await db.exec(stmt)).one()
@@ -1,7 +1,8 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID, uuid4
-from sqlmodel import SQLModel, Field as SQLModelField, Session, select
+from sqlmodel import SQLModel, Field as SQLModelField, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .enum import ProgramStatus
 
 class ProgramDTO(BaseModel):
@@ -27,19 +28,21 @@ class Program(SQLModel, table=True):
     updated_at: int = SQLModelField(nullable=True, default_factory=lambda: int(datetime.now().timestamp()))
 
     @classmethod
-    def get_by_client_id(cls, db: Session, client_id: UUID):
-        return db.exec(select(cls).where(cls.client_u_id == client_id)).all()
+    async def get_by_client_id(cls, db: AsyncSession, client_id: UUID):
+        return (await db.exec(select(cls).where(cls.client_u_id == client_id))).all()
 
     @classmethod
-    def get_all(cls, db: Session):
-        return db.exec(select(cls)).all()
+    async def get_all(cls, db: AsyncSession):
+        return (await db.exec(select(cls))).all()
 
     @classmethod
-    def update_status(cls, db: Session, program_id: UUID, new_status: ProgramStatus):
-        program = db.exec(select(cls).where(cls.u_id == program_id)).first()
-        if program:
-            program.status = new_status
-            db.add(program)
-            db.commit()
-            return program
-        return None
\ No newline at end of file
+    async def update_status(cls, db: AsyncSession, program_id: UUID, new_status: ProgramStatus):
+        stmt = (
+            update(cls)
+            .where(cls.u_id == program_id) # type: ignore
+            .values(status=new_status, updated_at=int(datetime.now().timestamp()))
+            .returning(cls)
+        )
+        program = (await db.exec(stmt)).scalars().first() # type: ignore
+        await db.commit()
+        return program
\ No newline at end of file
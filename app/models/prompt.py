@@ -1,16 +1,19 @@
+import asyncio
+import base64
 import uuid
 from typing import List
 from datetime import datetime
 from pydantic import BaseModel, Field
 from sqlmodel import (
     SQLModel, 
-    Session, 
     Field as SQLModelField,
     select,
-    insert,
     update,
+    func,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Index, delete, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 
 from app.core.config import settings
 from app.models.auth import User
@@ -50,19 +53,44 @@ class Message(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+def encode_message_cursor(created_at: datetime, u_id: uuid.UUID) -> str:
+    """ 메시지의 (created_at, u_id) 를 외부에 노출할 불투명한 커서 문자열로 변환 """
+    raw = f"{created_at.isoformat()}|{u_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """ 잘못된 커서는 ValueError """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, u_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(u_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 class History(BaseModel):
     
     u_id: uuid.UUID = Field(default_factory=uuid.uuid4)
     user: User
     messages: List[Message]
+    # 압축되어 ThreadArchive 로 옮겨진 이전 메시지의 요약
+    summary: str | None = None
+    # 더 이전 메시지가 있으면 다음 페이지를 요청할 때 before 로 보낼 커서
+    next_before: str | None = None
     
 
 class Thread(SQLModel, table=True):
 
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # 유저마다 thread 하나. 처음 요청이 동시에 와도 upsert 가 같은 행으로 모임
+        Index("ux_thread_user_id", "user_id", unique=True),
+        {"extend_existing": True},
+    )
 
     u_id: uuid.UUID = SQLModelField(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = SQLModelField(foreign_key="user.u_id", nullable=False)
+    # add_message 로 쌓아 두었다가 commit_current 때 ThreadMessage 로 옮길 메시지 (DB 에는 예전 데이터만 남아 있음)
     messages: List[dict] = SQLModelField(sa_type=JSONB, nullable=False, description="The JSON value stored in the table")  # dict로 변경
     # thread_type: str = SQLModelField(default="chat")
 
@@ -70,11 +98,13 @@ class Thread(SQLModel, table=True):
     updated_at: datetime = SQLModelField(default_factory=datetime.now)
 
     summary: str | None = None
+    # 마지막으로 압축을 시도한 시각. 이후에 메시지가 없으면 다시 시도해도 같으므로 get_compactable 에서 뺌
+    compacted_at: datetime | None = None
 
     @classmethod
-    def get(
+    async def get(
         cls, 
-        db: Session, 
+        db: AsyncSession, 
         u_id: uuid.UUID
     ) -> "Thread | None":
         
@@ -83,16 +113,16 @@ class Thread(SQLModel, table=True):
             .where(cls.u_id == u_id)
         )
 
-        exist = db.exec(stmt).first()
+        exist = (await db.exec(stmt)).first()
         if exist is None:
             return None
         
         return exist
     
     @classmethod
-    def get_by_user(
+    async def get_by_user(
         cls, 
-        db: Session, 
+        db: AsyncSession, 
         user_id: uuid.UUID
     ) -> "Thread | None":
         
@@ -101,7 +131,7 @@ class Thread(SQLModel, table=True):
             .where(cls.user_id == user_id)
         )
 
-        exist = db.exec(stmt).first()
+        exist = (await db.exec(stmt)).first()
         if exist is None:
             return None
         
@@ -109,9 +139,37 @@ class Thread(SQLModel, table=True):
     
 
     @classmethod
-    def put(
+    def _upsert_stmt(
+        cls,
+        u_id: uuid.UUID,
+        messages: List[dict],
+        updated_at: datetime,
+        user_id: uuid.UUID | None,
+        summary: str | None,
+        created_at: datetime | None,
+    ):
+        # 유저의 thread 가 이미 있으면 (u_id 가 달라도) messages, updated_at 만 바꿈 (summary 는 compact 만 바꿈)
+        stmt = pg_insert(cls).values(
+            u_id=u_id,
+            user_id=user_id,
+            messages=messages,
+            created_at=created_at,
+            updated_at=updated_at,
+            summary=summary
+        )
+        return (
+            stmt.on_conflict_do_update(
+                index_elements=[cls.user_id],
+                set_={"messages": stmt.excluded.messages, "updated_at": stmt.excluded.updated_at}
+            )
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        )
+
+    @classmethod
+    async def put(
         cls, 
-        db: Session,
+        db: AsyncSession,
         u_id: uuid.UUID,
         messages: List[dict],
         updated_at: datetime,
@@ -119,50 +177,37 @@ class Thread(SQLModel, table=True):
         user_id: uuid.UUID | None = None,
         summary: str | None = None,
         created_at: datetime | None = None,                
-    ) -> None:
+    ) -> "Thread":
         
         try:            
-            statement = select(cls).where(cls.u_id == u_id)
-            result = db.exec(statement).first()
-            
-            # update
-            if result:
-                stmt = (
-                    update(cls)
-                    .where(cls.u_id == u_id) # type: ignore
-                    .values(messages=messages, updated_at=updated_at)
-                )
-                db.exec(stmt) # type: ignore
-
-            else:
-                stmt = (
-                    insert(cls)
-                    .values(
-                        u_id=u_id,
-                        user_id=user_id,
-                        messages=messages,
-                        created_at=created_at,
-                        updated_at=updated_at,
-                        summary=summary
-                    )
-                )
-                db.exec(stmt) # type: ignore
-
-            db.commit()
+            stmt = cls._upsert_stmt(u_id, messages, updated_at, user_id, summary, created_at)
+            thread = (await db.exec(stmt)).scalar_one() # type: ignore
+            await db.commit()
+            return thread
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise e
 
 
-    def get_history(self, db: Session) -> History:
+    async def get_history(
+        self, 
+        db: AsyncSession,
+        limit: int = settings.THREAD_HISTORY_PAGE_SIZE,
+        before: str | None = None
+    ) -> History:
+        """ before 커서 이전의 최근 메시지 limit 개 (오래된 순) """
 
-        entity = User.get_by_id(db, self.user_id)
+        entity = await User.get_by_id(db, self.user_id)
         if entity is None:
             raise ValueError("유저 정보를 찾을 수 없습니다.")
 
-        messages = [Message.model_validate(msg) for msg in self.messages]
-        messages.sort(key=lambda x: x.created_at)
-        return History(user=entity, messages=messages)
+        messages, has_more = await ThreadMessage.get_page(db, self.u_id, limit, before)
+        return History(
+            user=entity, 
+            messages=messages, 
+            summary=self.summary,
+            next_before=encode_message_cursor(messages[0].created_at, messages[0].u_id) if has_more else None
+        )
     
 
     def add_message(self, message: Message) -> int:
@@ -172,49 +217,242 @@ class Thread(SQLModel, table=True):
     def get_messages(self) -> List[Message]:
         return [Message.model_validate(msg) for msg in self.messages]
     
-    def commit_current(self, db: Session) -> None:
-
-        Thread.put(
-            db, 
-            u_id=self.u_id,
-            messages=self.messages,
-            updated_at=datetime.now(),
-            user_id=self.user_id,
-            summary=self.summary,
-            created_at=self.created_at            
+    async def commit_current(self, db: AsyncSession) -> None:
+        """ thread 행을 저장하고 add_message 로 쌓인 메시지를 ThreadMessage 에 추가 (기존 메시지는 다시 쓰지 않음) """
+
+        # upsert 결과가 세션에 있는 이 객체에도 반영되어 messages 가 [] 가 되므로 먼저 꺼내 둠
+        pending = self.get_messages()
+        # thread 행과 메시지를 한 트랜잭션으로
+        try:
+            stmt = Thread._upsert_stmt(
+                self.u_id, [], datetime.now(), self.user_id, self.summary, self.created_at
+            )
+            # 같은 유저의 thread 를 다른 요청이 먼저 만들었으면 그 행의 u_id 로 메시지를 붙임
+            thread_id = (await db.exec(stmt)).scalar_one().u_id # type: ignore
+            db.add_all([ThreadMessage.from_message(thread_id, message) for message in pending])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise e
+        self.u_id = thread_id
+        self.messages = []
+
+    @classmethod
+    async def backfill_messages(cls, db: AsyncSession) -> int:
+        """ messages 컬럼에 남아 있는 예전 메시지를 ThreadMessage 로 옮김 """
+        count = 0
+        stmt = select(cls).where(func.jsonb_array_length(cls.messages) > 0)
+        for thread in (await db.exec(stmt)).all():
+            rows = [
+                ThreadMessage.from_message(thread.u_id, Message.model_validate(msg)).model_dump()
+                for msg in thread.messages
+            ]
+            await db.exec(pg_insert(ThreadMessage).values(rows).on_conflict_do_nothing()) # type: ignore
+            await db.exec(update(cls).where(cls.u_id == thread.u_id).values(messages=[])) # type: ignore
+            await db.commit()
+            count += len(rows)
+        return count
+
+    @classmethod
+    async def merge_duplicates(cls, db: AsyncSession) -> int:
+        """
+        ux_thread_user_id 를 만들기 전에, 유저마다 여러 개 생긴 thread 를 가장 먼저 만든 것 하나로 합침.
+        나머지 thread 의 메시지와 압축 기록을 옮기고 행을 지움 (summary 는 남기는 thread 의 것을 씀)
+        """
+        ranked = select(
+            cls.u_id,
+            func.first_value(cls.u_id).over(
+                partition_by=cls.user_id,
+                order_by=(cls.created_at, cls.u_id)
+            ).label("keep_id")
+        ).subquery()
+        duplicates = select(ranked.c.u_id, ranked.c.keep_id).where(ranked.c.u_id != ranked.c.keep_id).subquery()
+
+        for table in (ThreadMessage, ThreadArchive):
+            await db.exec(
+                update(table)
+                .where(table.thread_id == duplicates.c.u_id) # type: ignore
+                .values(thread_id=duplicates.c.keep_id)
+            ) # type: ignore
+        stmt = (
+            delete(cls)
+            .where(cls.u_id.in_(select(duplicates.c.u_id))) # type: ignore
+            .returning(cls.u_id) # type: ignore
         )
+        merged = len((await db.exec(stmt)).scalars().all()) # type: ignore
+        await db.commit()
+        return merged
 
+    @classmethod
+    async def get_compactable(cls, db: AsyncSession, limit: int) -> List["Thread"]:
+        """
+        메시지 수나 크기가 압축 기준을 넘은 thread.
+        마지막 시도 뒤로 새 메시지가 없는 thread (메시지 하나가 너무 커서 줄일 수 없는 등) 는 빼고,
+        오래전에 시도한 thread 부터 (한 번도 안 한 thread 가 먼저)
+        """
+        oversized = (
+            select(ThreadMessage.thread_id, func.max(ThreadMessage.created_at).label("last_message_at"))
+            .group_by(ThreadMessage.thread_id) # type: ignore
+            .having(
+                (func.count() > settings.THREAD_COMPACT_MAX_MESSAGES)
+                | (func.sum(func.octet_length(ThreadMessage.content)) > settings.THREAD_COMPACT_MAX_BYTES)
+            )
+            .subquery()
+        )
+        stmt = (
+            select(cls)
+            .join(oversized, oversized.c.thread_id == cls.u_id)
+            .where(cls.compacted_at.is_(None) | (oversized.c.last_message_at > cls.compacted_at)) # type: ignore
+            .order_by(cls.compacted_at.asc().nulls_first(), cls.updated_at) # type: ignore
+            .limit(limit)
+        )
+        threads = (await db.exec(stmt)).all()
+        await db.commit()
+        return list(threads)
 
+    @classmethod
+    async def mark_compacted(cls, db: AsyncSession, u_id: uuid.UUID, attempted_at: datetime) -> None:
+        """ 압축을 시도한 시각을 남김 (결과와 상관없이) """
+        await db.exec(update(cls).where(cls.u_id == u_id).values(compacted_at=attempted_at)) # type: ignore
+        await db.commit()
 
+    @classmethod
+    async def compact(
+        cls,
+        db: AsyncSession,
+        u_id: uuid.UUID,
+        archived: List[Message],
+        summary: str
+    ) -> bool:
+        """
+        ThreadMessage 중 archived 를 지우고 ThreadArchive 로 옮기면서 summary 를 바꿈.
+        요약하는 동안 다른 곳에서 먼저 압축했으면 (지울 메시지가 이미 없으면) 아무것도 하지 않고 False
+        """
+        if not archived:
+            return False
+
+        ids = [message.u_id for message in archived]
+        stmt = (
+            delete(ThreadMessage)
+            .where(ThreadMessage.thread_id == u_id, ThreadMessage.u_id.in_(ids)) # type: ignore
+            .returning(ThreadMessage.u_id) # type: ignore
+        )
+        deleted = (await db.exec(stmt)).scalars().all() # type: ignore
+        if len(deleted) != len(ids):
+            await db.rollback()
+            return False
+
+        await db.exec(update(cls).where(cls.u_id == u_id).values(summary=summary)) # type: ignore
+        db.add(ThreadArchive(
+            thread_id=u_id,
+            messages=[message.model_dump(mode="json") for message in archived],
+            summary=summary,
+            first_message_at=archived[0].created_at,
+            last_message_at=archived[-1].created_at,
+        ))
+        await db.commit()
+        return True
+
+
+class ThreadMessage(SQLModel, table=True):
+    """ thread 의 메시지 하나. 추가만 하고 고치지 않음 (압축되면 ThreadArchive 로 옮겨짐) """
+
+    __table_args__ = (
+        Index("ix_threadmessage_thread_id_created_at", "thread_id", "created_at"),
+    )
+
+    u_id: uuid.UUID = SQLModelField(primary_key=True)
+    thread_id: uuid.UUID = SQLModelField(foreign_key="thread.u_id", nullable=False)
+    role: Role
+    content: str
+    parent_id: uuid.UUID | None = SQLModelField(default=None)
 
-if __name__ == "__main__":
+    created_at: datetime = SQLModelField(default_factory=datetime.now)
 
-    from app.deps import get_db
-    db = next(get_db())
+    @classmethod
+    def from_message(cls, thread_id: uuid.UUID, message: Message) -> "ThreadMessage":
+        return cls(thread_id=thread_id, **message.model_dump())
 
-    request_id = uuid.uuid4()
-    user = User.get(db, "admin")
-    if user is None:
-        raise ValueError("유저 정보를 찾을 수 없습니다.")
+    def to_message(self) -> Message:
+        return Message.model_validate(self, from_attributes=True)
 
-    thread = Thread.get_by_user(db, user.u_id)
+    @classmethod
+    async def get_all(cls, db: AsyncSession, thread_id: uuid.UUID) -> List[Message]:
+        stmt = (
+            select(cls)
+            .where(cls.thread_id == thread_id)
+            .order_by(cls.created_at, cls.u_id) # type: ignore
+        )
+        return [row.to_message() for row in (await db.exec(stmt)).all()]
 
-    if thread is None:
-        thread = Thread(user_id=user.u_id, messages=[])
-    
-    user_prompt = "안녕하세요"
-    prompt = Prompt(request_id=request_id, user=user, user_prompt=user_prompt)
+    @classmethod
+    async def get_page(
+        cls,
+        db: AsyncSession,
+        thread_id: uuid.UUID,
+        limit: int,
+        before: str | None = None
+    ) -> tuple[List[Message], bool]:
+        """
+        before 커서 이전의 최근 메시지 limit 개를 오래된 순으로, 그리고 더 이전 메시지가 있는지.
+        created_at 이 같은 메시지를 건너뛰지 않도록 (created_at, u_id) 로 keyset
+        """
+        stmt = select(cls).where(cls.thread_id == thread_id)
+        if before is not None:
+            created_at, u_id = decode_message_cursor(before)
+            stmt = stmt.where(tuple_(cls.created_at, cls.u_id) < (created_at, u_id))
+        stmt = stmt.order_by(cls.created_at.desc(), cls.u_id.desc()).limit(limit + 1) # type: ignore
+
+        rows = (await db.exec(stmt)).all()
+        has_more = len(rows) > limit
+        messages = [row.to_message() for row in rows[:limit]]
+        messages.reverse()
+        return messages, has_more
+
+
+class ThreadArchive(SQLModel, table=True):
+    """ Thread.compact 로 ThreadMessage 에서 빠진 메시지 묶음과 그때 만든 요약 """
 
-    user_message = Message(content=prompt.user_prompt, role=Role.USER, parent_id=None)
-    count = thread.add_message(user_message)
-    print(count)
-    
-    response = "안녕하세요! 저는 챗봇입니다."
-    assistant_message = Message(content=response, role=Role.ASSISTANT, parent_id=user_message.u_id)
-    count = thread.add_message(assistant_message)
-    print(count)
+    u_id: uuid.UUID = SQLModelField(default_factory=uuid.uuid4, primary_key=True)
+    thread_id: uuid.UUID = SQLModelField(foreign_key="thread.u_id", index=True, nullable=False)
+    messages: List[dict] = SQLModelField(sa_type=JSONB, nullable=False)
+    summary: str
 
-    thread.commit_current(db)
+    first_message_at: datetime
+    last_message_at: datetime
+    created_at: datetime = SQLModelField(default_factory=datetime.now)
+
+
+async def _main():
+
+    from app.core.db import new_session
+    async with new_session() as db:
+
+        request_id = uuid.uuid4()
+        user = await User.get(db, "admin")
+        if user is None:
+            raise ValueError("유저 정보를 찾을 수 없습니다.")
+
+        thread = await Thread.get_by_user(db, user.u_id)
 
+        if thread is None:
+            thread = Thread(user_id=user.u_id, messages=[])
+        
+        user_prompt = "안녕하세요"
+        prompt = Prompt(request_id=request_id, user=user, user_prompt=user_prompt)
+
+        user_message = Message(content=prompt.user_prompt, role=Role.USER, parent_id=None)
+        count = thread.add_message(user_message)
+        print(count)
+        
+        response = "안녕하세요! 저는 챗봇입니다."
+        assistant_message = Message(content=response, role=Role.ASSISTANT, parent_id=user_message.u_id)
+        count = thread.add_message(assistant_message)
+        print(count)
+
+        await thread.commit_current(db)
+
+
+if __name__ == "__main__":
 
-    
\ No newline at end of file
+    asyncio.run(_main())
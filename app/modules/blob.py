@@ -1,67 +1,185 @@
-import io
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+import asyncio
+import aiohttp
+from typing import AsyncIterator, Protocol
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.storage.blob import BlobProperties
+from azure.storage.blob.aio import BlobServiceClient, BlobClient
 
 from app.core.config import settings
 
-CONTAINER_NAME = settings.AZURE_BLOB_CONTAINER
+CONTAINER_NAME = settings.AZURE_BLOB_CONTAINER or ""
 
 
-def _get_blob_property(blob_cilent: BlobClient):
-    return blob_cilent.get_blob_properties()
+class AsyncReader(Protocol):
+    async def read(self, size: int = -1) -> bytes: ...
 
 
-def upload_blob_stream(
+def create_blob_service() -> BlobServiceClient:
+    """ 
+    앱 전체에서 공유할 blob 클라이언트. 
+    요청마다 클라이언트를 만들면 매번 TCP/TLS 연결을 새로 맺으므로 lifespan 에서 한 번만 만들고 종료 시 close 함
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.AZURE_BLOB_POOL_SIZE,
+        limit_per_host=settings.AZURE_BLOB_POOL_SIZE,
+        keepalive_timeout=settings.AZURE_BLOB_KEEPALIVE_SECONDS,
+    )
+    # session_owner=True: 클라이언트를 close 하면 세션(커넥션 풀)도 같이 닫힘
+    # transport 를 직접 넘기면 클라이언트에 준 timeout 은 무시되므로 transport 에 설정
+    transport = AioHttpTransport(
+        session=aiohttp.ClientSession(connector=connector),
+        session_owner=True,
+        connection_timeout=settings.AZURE_BLOB_CONNECTION_TIMEOUT,
+        read_timeout=settings.AZURE_BLOB_READ_TIMEOUT,
+    )
+    return BlobServiceClient.from_connection_string(
+        settings.AZURE_BLOB_KEY,
+        transport=transport,
+    )
+
+
+async def _get_blob_property(blob_cilent: BlobClient):
+    return await blob_cilent.get_blob_properties()
+
+
+async def upload_blob_stream(
     blob_service: BlobServiceClient,
     blob_name: str,
-    blob_buffer: io.BytesIO,
-    container_name: str = CONTAINER_NAME
+    source: AsyncReader,
+    container_name: str = CONTAINER_NAME,
+    block_size: int = settings.BLOB_UPLOAD_BLOCK_SIZE,
+    concurrency: int = settings.BLOB_UPLOAD_CONCURRENCY,
 ):
+    """ 
+    source 를 block_size 씩 읽어 블록으로 병렬 업로드(stage) 후 한 번에 commit.
+    동시에 메모리에 올라가는 양은 block_size * concurrency 를 넘지 않음
+    """
     blob_client = blob_service.get_blob_client(
-        container=CONTAINER_NAME, 
+        container=container_name, 
         blob=blob_name
     )
-    input_stream = blob_buffer
-    blob_client.upload_blob(input_stream, blob_type="BlockBlob")
 
+    block_ids: list[str] = []
+    pending: set[asyncio.Task] = set()
+    size = 0
     try:
-        meta= _get_blob_property(blob_client)
-    except Exception as e:
-        print(e)
-        return None
-    
-    return meta
+        while True:
+            chunk = await source.read(block_size)
+            if not chunk:
+                break
+            size += len(chunk)
 
+            # 블록 id 는 모두 같은 길이여야 함
+            block_id = f"{len(block_ids):08d}"
+            block_ids.append(block_id)
+            pending.add(asyncio.create_task(
+                blob_client.stage_block(block_id, chunk)
+            ))
 
-def download_blob_to_stream(
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            for task in done:
+                task.result()
+
+        meta = await blob_client.commit_block_list(block_ids) # type: ignore
+        return {**meta, "size": size}
+    except BaseException:
+        # 클라이언트가 끊겨 취소된 경우에도 올리던 블록을 남겨 두지 않도록 취소하고 끝날 때까지 기다림
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+
+
+async def get_blob_properties(
     blob_service: BlobServiceClient,
     blob_name: str,
     container_name: str = CONTAINER_NAME
-):
+) -> BlobProperties | None:
     blob_client = blob_service.get_blob_client(
-        container=CONTAINER_NAME, 
+        container=container_name, 
         blob=blob_name
     )
-
     try:
-        bytes = blob_client.download_blob().readall()
-        stream = io.BytesIO(bytes)
-        stream.seek(0)
-    except Exception as e:
-        print(e)
+        return await _get_blob_property(blob_client)
+    except ResourceNotFoundError:
         return None
 
-    return stream
 
+async def iter_blob_chunks(
+    blob_service: BlobServiceClient,
+    blob_name: str,
+    offset: int = 0,
+    length: int | None = None,
+    etag: str | None = None,
+    container_name: str = CONTAINER_NAME
+) -> AsyncIterator[bytes]:
+    """ 
+    blob 의 [offset, offset + length) 구간을 청크 단위로 내려받음 (전체를 메모리에 올리지 않음).
+    etag 를 주면 그 사이 blob 이 바뀐 경우 다른 내용을 섞어 보내지 않고 실패함
+    """
+    if length == 0:
+        return
+    
+    blob_client = blob_service.get_blob_client(
+        container=container_name, 
+        blob=blob_name
+    )
+    options = {}
+    if etag:
+        options = {"etag": etag, "match_condition": MatchConditions.IfNotModified}
+
+    downloader = await blob_client.download_blob(offset=offset, length=length, **options)
+    async for chunk in downloader.chunks():
+        yield chunk
 
-def delete_blob(
+
+async def delete_blob(
     blob_service: BlobServiceClient, 
     blob_name: str,
     container_name: str = CONTAINER_NAME
-):
-    blob_client = blob_service.get_blob_client(container=CONTAINER_NAME, blob=blob_name)
-    blob_client.delete_blob()
-
+) -> bool:
+    """ 지운 뒤(또는 원래 없어서) blob 이 없으면 True """
+    blob_client = blob_service.get_blob_client(container=container_name, blob=blob_name)
     try:
-        _get_blob_property(blob_client)
-    except Exception as e:
-        return None
\ No newline at end of file
+        await blob_client.delete_blob()
+    except ResourceNotFoundError:
+        pass
+    return True
+
+
+# Blob Batch API 한 번에 보낼 수 있는 최대 요청 수
+BATCH_DELETE_LIMIT = 256
+
+
+async def delete_blobs(
+    blob_service: BlobServiceClient,
+    blob_names: list[str],
+    container_name: str = CONTAINER_NAME
+) -> list[bool]:
+    """ Blob Batch API 로 여러 blob 을 한 번에 삭제. 이름 순서대로 성공 여부 (없던 blob 도 성공) """
+    container_client = blob_service.get_container_client(container_name)
+    results: list[bool] = []
+    for i in range(0, len(blob_names), BATCH_DELETE_LIMIT):
+        responses = await container_client.delete_blobs(
+            *blob_names[i:i + BATCH_DELETE_LIMIT], 
+            raise_on_any_failure=False
+        )
+        results.extend([response.status_code in (202, 404) async for response in responses])
+    return results
+
+
+async def list_blobs(
+    blob_service: BlobServiceClient,
+    container_name: str = CONTAINER_NAME
+) -> AsyncIterator[BlobProperties]:
+    container_client = blob_service.get_container_client(container_name)
+    async for props in container_client.list_blobs():
+        yield props
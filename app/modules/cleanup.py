@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import new_session
+from app.models import BlobDeleteJob
+from app.modules.storage import Storage
+
+
+class BlobCleanupWorker:
+    """
+    BlobDeleteJob 을 묶음으로 꺼내 저장소에서 지우는 백그라운드 작업.
+    BLOB_SWEEP_INTERVAL_SECONDS 가 있으면 어디서도 참조하지 않는 blob 을 주기적으로 찾아 대기열에 넣음.
+    여러 워커 프로세스가 동시에 돌아도 claim 이 겹치지 않음
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+        self._tasks: list[asyncio.Task] = []
+
+        self.deleted = 0
+        self.failed = 0
+        self.swept = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._run()))
+        if settings.BLOB_SWEEP_INTERVAL_SECONDS > 0:
+            self._tasks.append(asyncio.create_task(self._sweep_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def process_batch(self) -> int:
+        """ 한 묶음을 처리하고 가져간 작업 수를 반환. 실패한 작업은 claim 때 정한 시각에 다시 시도됨 """
+        async with new_session() as db:
+            names = await BlobDeleteJob.claim(db, settings.BLOB_DELETE_BATCH_SIZE)
+        if not names:
+            return 0
+
+        results = await self.storage.delete_many(names)
+        done = [name for name, ok in zip(names, results) if ok]
+
+        async with new_session() as db:
+            await BlobDeleteJob.complete(db, done)
+
+        self.deleted += len(done)
+        self.failed += len(names) - len(done)
+        return len(names)
+
+    async def sweep(self) -> int:
+        """ grace 기간보다 오래됐는데 참조가 없는 blob 을 삭제 대기열에 넣고 그 수를 반환 """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.BLOB_SWEEP_GRACE_SECONDS)
+        swept = 0
+        candidates: list[str] = []
+        async for name, last_modified in self.storage.list_files():
+            if last_modified < cutoff:
+                candidates.append(name)
+            if len(candidates) >= settings.BLOB_DELETE_BATCH_SIZE:
+                swept += await self._enqueue_orphans(candidates)
+                candidates = []
+        swept += await self._enqueue_orphans(candidates)
+
+        self.swept += swept
+        return swept
+
+    async def _enqueue_orphans(self, names: list[str]) -> int:
+        if not names:
+            return 0
+        async with new_session() as db:
+            return len(await BlobDeleteJob.enqueue_orphans(db, names))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                print("blob 삭제 작업 처리중 오류남: ", e)
+                self.errors += 1
+                processed = 0
+
+            # 꽉 찬 묶음이었으면 남은 작업이 있으므로 바로 다음 묶음
+            if processed < settings.BLOB_DELETE_BATCH_SIZE:
+                await asyncio.sleep(settings.BLOB_DELETE_POLL_SECONDS)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.BLOB_SWEEP_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print("고아 blob 정리중 오류남: ", e)
+                self.errors += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "swept": self.swept,
+            "errors": self.errors,
+        }
+
+
+def create_cleanup_worker(storage: Storage) -> BlobCleanupWorker:
+    worker = BlobCleanupWorker(storage)
+    metrics.register("blob_cleanup", worker.stats)
+    return worker
@@ -0,0 +1,255 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import new_session
+from app.models import Message, Prompt, Thread, ThreadMessage, User
+from app.modules import llm
+
+SUMMARY_SYSTEM_PROMPT = """
+당신은 유저와 챗봇의 대화 기록을 요약하는 도우미입니다.
+이후 대화에서 참고할 수 있도록 유저가 만든 프로젝트, 요청, 선호, 결정된 사항을 사실 위주로 남기세요.
+"""
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """ 앞부분만 남겨 대략 max_tokens 이내로 자름 """
+    max_chars = max_tokens * 2
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1] + "…"
+
+
+def _render_line(message: Message) -> str:
+    return f"{message.role.value}: {message.content}"
+
+
+def render_messages(messages: list[Message], max_tokens: int) -> str:
+    """ 'role: content' 줄로 이어 붙임. 토큰 상한을 넘으면 오래된 메시지부터 뺌 """
+    lines: list[str] = []
+    used = 0
+    for message in reversed(messages):
+        line = _render_line(message)
+        tokens = llm.count_tokens(line)
+        if used + tokens > max_tokens:
+            if not lines:
+                lines.append(truncate_tokens(line, max_tokens))
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(reversed(lines))
+
+
+def archive_count(messages: list[Message]) -> int:
+    """
+    앞에서부터 압축할 메시지 수.
+    최근 THREAD_COMPACT_KEEP_MESSAGES 개까지를 크기 기준의 절반 안에서 남기고 (최소 1개) 나머지를 뺌
+    """
+    keep = 0
+    size = 0
+    for message in reversed(messages):
+        size += len(message.content.encode())
+        if keep >= settings.THREAD_COMPACT_KEEP_MESSAGES:
+            break
+        if keep > 0 and size > settings.THREAD_COMPACT_MAX_BYTES // 2:
+            break
+        keep += 1
+    return len(messages) - keep
+
+
+def fitting_count(messages: list[Message], max_tokens: int) -> int:
+    """
+    앞에서부터 render_messages 로 이어 붙여도 max_tokens 안에 드는 메시지 수.
+    첫 메시지 하나가 상한을 넘으면 잘라서라도 요약해야 하므로 1
+    """
+    used = 0
+    for count, message in enumerate(messages):
+        used += llm.count_tokens(_render_line(message))
+        if used > max_tokens:
+            return max(count, 1)
+    return len(messages)
+
+
+class Summarizer(ABC):
+    """
+    이전 summary 에 새로 빠지는 메시지를 합쳐 THREAD_SUMMARY_MAX_TOKENS 이내의 새 summary 를 만듦.
+    settings.THREAD_SUMMARIZER 에 따라 LLM 또는 로컬 구현을 사용함
+    """
+
+    @abstractmethod
+    async def summarize(self, user: User, summary: str | None, messages: list[Message]) -> str: ...
+
+    def input_count(self, messages: list[Message]) -> int:
+        """ 한 번에 요약할 수 있는 앞쪽 메시지 수. 나머지는 다음 차례에 요약함 """
+        return len(messages)
+
+
+class LocalSummarizer(Summarizer):
+    """ LLM 을 부르지 않는 요약: 메시지마다 첫 줄만 남기고, 넘치면 오래된 내용부터 버림 """
+
+    async def summarize(self, user: User, summary: str | None, messages: list[Message]) -> str:
+        lines = [summary] if summary else []
+        for message in messages:
+            content = message.content.strip()
+            first_line = content.splitlines()[0] if content else ""
+            lines.append(f"{message.role.value}: {first_line}")
+
+        text = "\n".join(lines)
+        max_chars = settings.THREAD_SUMMARY_MAX_TOKENS * 2
+        return text[-max_chars:]
+
+
+class LLMSummarizer(Summarizer):
+
+    def input_count(self, messages: list[Message]) -> int:
+        # 입력 상한을 넘는 메시지는 요약에 들어가지 못한 채 지워지므로 상한 안에 드는 만큼만
+        return fitting_count(messages, settings.THREAD_SUMMARY_INPUT_TOKENS)
+
+    async def summarize(self, user: User, summary: str | None, messages: list[Message]) -> str:
+        conversation = render_messages(messages, settings.THREAD_SUMMARY_INPUT_TOKENS)
+        user_prompt = f"""
+        ## 이전 요약
+
+        {summary or "없음"}
+
+        ## 새 대화
+
+        {conversation}
+
+        이전 요약과 새 대화를 합쳐 {settings.THREAD_SUMMARY_MAX_TOKENS} 토큰 이내의 요약 하나로 만드세요.
+        """
+        prompt = Prompt(
+            request_id=uuid.uuid4(),
+            user=user,
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+            user_prompt=user_prompt
+        )
+        response: llm.BaseGPTResponse | None = await llm.infer(prompt) # type: ignore
+        if response is None:
+            raise ValueError("LLM 요약 응답이 없습니다.")
+        return truncate_tokens(response.response, settings.THREAD_SUMMARY_MAX_TOKENS)
+
+
+def create_summarizer() -> Summarizer:
+    if settings.THREAD_SUMMARIZER == "local":
+        return LocalSummarizer()
+    return LLMSummarizer()
+
+
+class ThreadCompactor:
+    """
+    메시지 수나 크기가 기준을 넘은 Thread 의 오래된 메시지를 요약해 summary 에 합치고 ThreadArchive 로 옮기는 백그라운드 작업.
+    요약하는 동안 DB 락을 잡지 않고, 저장할 때 다른 곳에서 먼저 압축했으면 버림
+    """
+
+    def __init__(self, summarizer: Summarizer):
+        self.summarizer = summarizer
+        self._task: asyncio.Task | None = None
+
+        self.compacted = 0
+        self.archived_messages = 0
+        self.conflicts = 0
+        self.errors = 0
+        self.last_summarize_ms = 0
+
+    def start(self) -> None:
+        if settings.THREAD_COMPACT_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def compact_batch(self) -> int:
+        """ 기준을 넘은 thread 를 한 묶음 압축하고 압축한 thread 수를 반환 """
+        async with new_session() as db:
+            threads = await Thread.get_compactable(db, settings.THREAD_COMPACT_BATCH_SIZE)
+
+        compacted = 0
+        for thread in threads:
+            # 시도 전 시각을 남겨야 압축하는 동안 들어온 메시지가 다음 조회에 걸림
+            attempted_at = datetime.now()
+            try:
+                compacted += await self.compact(thread)
+            except Exception as e:
+                print("대화 기록 압축중 오류남: ", e)
+                self.errors += 1
+            try:
+                async with new_session() as db:
+                    await Thread.mark_compacted(db, thread.u_id, attempted_at)
+            except Exception as e:
+                print("대화 기록 압축 시각 저장중 오류남: ", e)
+                self.errors += 1
+        return compacted
+
+    async def compact(self, thread: Thread) -> bool:
+        """
+        요약기가 한 번에 받을 수 있는 만큼씩 나눠, 남길 메시지만 남을 때까지 여러 번 압축함.
+        한 번이라도 압축했으면 True
+        """
+        summary = thread.summary
+        compacted = False
+        while True:
+            async with new_session() as db:
+                messages = await ThreadMessage.get_all(db, thread.u_id)
+                user = await User.get_by_id(db, thread.user_id)
+            if user is None:
+                return compacted
+
+            count = archive_count(messages)
+            if count <= 0:
+                return compacted
+            count = self.summarizer.input_count(messages[:count])
+            archived = messages[:count]
+
+            started = time.perf_counter()
+            summary = await self.summarizer.summarize(user, summary, archived)
+            self.last_summarize_ms = int((time.perf_counter() - started) * 1000)
+
+            async with new_session() as db:
+                saved = await Thread.compact(db, thread.u_id, archived, summary)
+
+            if not saved:
+                self.conflicts += 1
+                return compacted
+
+            compacted = True
+            self.compacted += 1
+            self.archived_messages += count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                compacted = await self.compact_batch()
+            except Exception as e:
+                print("압축할 대화 기록 조회중 오류남: ", e)
+                self.errors += 1
+                compacted = 0
+
+            # 묶음을 모두 압축했으면 남은 thread 가 있을 수 있으므로 바로 다음 묶음
+            # (시도한 thread 는 새 메시지가 올 때까지 다시 조회되지 않으므로 줄일 수 없는 thread 가 묶음을 채우지 않음)
+            if compacted < settings.THREAD_COMPACT_BATCH_SIZE:
+                await asyncio.sleep(settings.THREAD_COMPACT_INTERVAL_SECONDS)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "summarizer": type(self.summarizer).__name__,
+            "compacted": self.compacted,
+            "archived_messages": self.archived_messages,
+            "conflicts": self.conflicts,
+            "errors": self.errors,
+            "last_summarize_ms": self.last_summarize_ms,
+        }
+
+
+def create_thread_compactor() -> ThreadCompactor:
+    compactor = ThreadCompactor(create_summarizer())
+    metrics.register("thread_compaction", compactor.stats)
+    return compactor
@@ -1,12 +1,19 @@
 import enum
+import re
+import httpx
+import jiter
 from datetime import datetime
 from pydantic import BaseModel, Field
-from openai import AsyncOpenAI
-from typing import Type
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import Any, AsyncIterator, Dict, Literal, Type
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.ratelimit import Limiter
 from app.models import Prompt, ProjectPriority, ProjectCategory
 
+MODEL = "gpt-4o-mini"
+
 class ResponseOption(enum.Enum):
     BASE='base'
     PROJECT='project'
@@ -29,46 +36,224 @@ class ProjectGPTResponse(BaseModel):
         return int(date.timestamp())
 
 
+_client: AsyncOpenAI | None = None
+
+limiter = Limiter(
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+)
+metrics.register("llm_limiter", limiter.stats)
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """ x-ratelimit-reset-* 형식 ("1s", "6m0s", "20ms") 을 초로 """
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _retry_after(headers: httpx.Headers) -> float:
+    retry_after_ms = _parse_int(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    try:
+        return float(headers.get("retry-after", ""))
+    except ValueError:
+        pass
+    # 헤더가 없으면 먼저 바닥나는 쪽이 다시 찰 때까지
+    resets = [
+        _parse_duration(headers.get("x-ratelimit-reset-requests")),
+        _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+    ]
+    return min((reset for reset in resets if reset), default=1.0)
+
+
+async def _observe_response(response: httpx.Response) -> None:
+    """ 
+    SDK 의 재시도까지 포함한 모든 응답에서 불리는 hook.
+    남은 요청/토큰 수로 limiter 의 예산을 맞추고, 429 면 서버가 말한 시간만큼 새 요청을 멈춤
+    """
+    headers = response.headers
+    limiter.requests.sync(
+        _parse_int(headers.get("x-ratelimit-limit-requests")),
+        _parse_int(headers.get("x-ratelimit-remaining-requests")),
+    )
+    limiter.tokens.sync(
+        _parse_int(headers.get("x-ratelimit-limit-tokens")),
+        _parse_int(headers.get("x-ratelimit-remaining-tokens")),
+    )
+    if response.status_code == 429:
+        limiter.pause(_retry_after(headers))
+
+
+def get_client() -> AsyncOpenAI:
+    """ 
+    프로세스 전체에서 공유하는 클라이언트. 
+    호출마다 만들면 커넥션 풀과 TLS 세션을 매번 버리므로 한 번만 만들고 lifespan 종료 때 닫음
+    """
+    global _client
+    if _client is None:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_SECONDS,
+            ),
+            event_hooks={"response": [_observe_response]},
+        )
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS),
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+
+def _response_model(response_option: ResponseOption) -> Type[BaseModel]:
+    match response_option:
+        case ResponseOption.BASE:
+            return BaseGPTResponse
+        case ResponseOption.PROJECT:
+            return ProjectGPTResponse
+
+
+def _messages(prompt: Prompt) -> list[dict]:
+    return [
+        {"role": "system", "content": prompt.system_prompt},
+        {"role": "user", "content": prompt.user_prompt},
+    ]
+
+
+def count_tokens(text: str) -> int:
+    """ 대략적인 토큰 수 (한글은 글자당 1 토큰 가까이 나오므로 넉넉하게 2 글자에 1 토큰) """
+    return (len(text) + 1) // 2
+
+
+def _estimate_tokens(prompt: Prompt) -> int:
+    """ 요청 전에 limiter 에서 쓰는 토큰 수 """
+    return count_tokens(prompt.system_prompt) + count_tokens(prompt.user_prompt) + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
 
 async def infer(
     prompt: Prompt, 
     response_option: ResponseOption = ResponseOption.BASE,
 ):
-    
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    
-    match response_option:
-        case ResponseOption.BASE:
-            response_model = BaseGPTResponse
-        case ResponseOption.PROJECT:
-            response_model = ProjectGPTResponse
-
-    system_prompt = prompt.system_prompt
-    user_prompt = prompt.user_prompt
-
-    inferring = await client.beta.chat.completions.parse(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format=response_model,
-    )
+    """ limiter 에서 차례를 기다린 뒤 호출. 대기열에서 LLM_QUEUE_TIMEOUT_SECONDS 를 넘기면 ratelimit.LimiterTimeout """
+    client = get_client()
+
+    async with limiter.slot(_estimate_tokens(prompt)):
+        inferring = await client.beta.chat.completions.parse(
+            model=MODEL,
+            messages=_messages(prompt), # type: ignore
+            response_format=_response_model(response_option),
+        )
 
     if inferring.choices[0].message.parsed:
         return inferring.choices[0].message.parsed
-    
 
-# async def stream(
-#     prompt: Prompt, 
-#     response_option: ResponseOption = ResponseOption.BASE,
-# ):
-#     inferring = await infer(prompt,response_option)
-
-#     match response_option:
-#         case ResponseOption.BASE:
-#             Streaming(status="질의 의도 이해중..", data=inferring)
-#         case ResponseOption.PROJECT:
-            
-    
 
+class Streaming(BaseModel):
+    """ 
+    stream 이 내보내는 이벤트.
+    partial: data 에 새로 도착한 부분만 (str 필드는 이어 붙일 뒷부분, enum 등 그 외 필드는 다 만들어진 값 전체)
+    done: data 는 완성된 응답, parsed 는 response_option 에 맞는 응답 모델 (실패하면 None)
+    """
+    status: Literal["partial", "done"]
+    data: Dict[str, Any] = Field(default_factory=dict)
+    parsed: Any = None
+
+
+def _text_fields(model: Type[BaseModel]) -> set[str]:
+    """ 생성되는 도중에도 흘려보낼 자유 텍스트 필드 (enum 은 str 이어도 완성된 값만 보냄) """
+    return {name for name, field in model.model_fields.items() if field.annotation is str}
+
+
+def _diff(previous: Dict[str, Any], current: Dict[str, Any], text_fields: set[str]) -> Dict[str, Any]:
+    delta = {}
+    for key, value in current.items():
+        before = previous.get(key)
+        if value == before:
+            continue
+        if key in text_fields and isinstance(value, str) and isinstance(before, str) and value.startswith(before):
+            delta[key] = value[len(before):]
+        else:
+            delta[key] = value
+    return delta
+
+
+async def stream(
+    prompt: Prompt, 
+    response_option: ResponseOption = ResponseOption.BASE,
+) -> AsyncIterator[Streaming]:
+    """ 
+    structured output 을 생성되는 대로 흘려보냄.
+    SDK 의 partial 파싱은 끝나지 않은 문자열을 빼므로 텍스트 필드는 스냅샷을 trailing-strings 모드로 직접 파싱하고,
+    그 외 필드는 끝나지 않은 문자열과 아직 뒤에 글자가 더 올 수 있는 마지막 값을 빼고 완성된 값만 보냄.
+    limiter 자리는 스트림이 끝날 때까지 차지함
+    """
+    client = get_client()
+    text_fields = _text_fields(_response_model(response_option))
+
+    previous: Dict[str, Any] = {}
+    async with limiter.slot(_estimate_tokens(prompt)), client.beta.chat.completions.stream(
+        model=MODEL,
+        messages=_messages(prompt), # type: ignore
+        response_format=_response_model(response_option),
+    ) as events:
+        async for event in events:
+            if event.type != "content.delta":
+                continue
+            snapshot = event.snapshot.encode()
+            try:
+                trailing = jiter.from_json(snapshot, partial_mode="trailing-strings")
+                settled = jiter.from_json(snapshot, partial_mode="on")
+            except ValueError:
+                continue
+            if not isinstance(trailing, dict) or not isinstance(settled, dict):
+                continue
+
+            # partial 파싱은 잘린 숫자 (173 까지 온 1730000000) 도 값으로 주므로
+            # 스냅샷이 마지막 값을 지나간 (, 나 } 로 끝난) 뒤에만 그 값을 완성된 것으로 봄
+            if settled and not event.snapshot.rstrip().endswith((",", "}")):
+                settled.pop(next(reversed(settled)))
+
+            current = {key: value for key, value in trailing.items() if key in text_fields}
+            current.update((key, value) for key, value in settled.items() if key not in text_fields)
+            delta = _diff(previous, current, text_fields)
+            if delta:
+                previous = current
+                yield Streaming(status="partial", data=delta)
+
+        completion = await events.get_final_completion()
+
+    parsed = completion.choices[0].message.parsed
+    yield Streaming(
+        status="done", 
+        data=parsed.model_dump(mode="json") if parsed else {}, 
+        parsed=parsed
+    )
@@ -0,0 +1,402 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import new_session
+from app.core.ratelimit import LimiterTimeout
+from app.models import (
+    JobStatus,
+    Message,
+    Project,
+    ProjectJob,
+    Prompt,
+    Role,
+    Thread,
+    User,
+)
+from app.models.prompt import SYSTEM_PROMPT
+from app.modules import llm
+
+DEFAULT_DURATION = timedelta(days=7)
+
+
+def _default_dates(now: datetime) -> tuple[int, int]:
+    return int(now.timestamp()), int((now + DEFAULT_DURATION).timestamp())
+
+
+def build_project_prompt(query: str, now: datetime | None = None) -> str:
+    start_date, end_date = _default_dates(now or datetime.now())
+    return f"""
+    ## Persona
+    당신은 좋은 프로젝트를 만들기 위해 노력하는 프로젝트 매니저입니다.
+
+    ## 목표
+    1. 당신의 목표는 <query>를 바탕으로 프로젝트의 메타데이터와 내용을 생성하는 것입니다. 프로젝트의 메타데이터는 프로젝트의 카테고리, 우선순위, 날짜 필터 등을 포함합니다.
+    2. <query>에서 프로젝트에 대한 정보를 최대한 추출해야합니다. 만약 <query>에서 프로젝트의 데이터를 추출할 수 없다면, <default> 값을 참고해서 생성하세요. 
+
+    ## 참고
+    - title은 프로젝트의 제목입니다.
+    - summary는 프로젝트 내용의 요약입니다.
+    - content는 프로젝트 내용입니다.
+    
+    - priority는 프로젝트의 우선순위입니다. 
+    - category는 프로젝트의 카테고리입니다.
+
+    - start_date는 프로젝트의 시작 날짜입니다.
+    - end_date는 프로젝트의 종료 날짜입니다.
+
+    - <default>
+        - title: 제목 없음
+        - summary: 요약 없음
+        - content: 내용 없음
+        - priority: LOW
+        - category: SHORT_TERM
+        - start_date: {start_date}
+        - end_date: {end_date}
+
+    ## <query>
+
+    {query}
+
+    """
+
+
+# 같은 query 로 만든 응답 (key: project_cache_key, value: (프롬프트를 만든 시각, 응답))
+project_cache: TTLCache[str, tuple[datetime, llm.ProjectGPTResponse]] = TTLCache(
+    maxsize=settings.LLM_CACHE_MAXSIZE,
+    ttl=settings.LLM_CACHE_TTL_SECONDS
+)
+metrics.register("llm_project_cache", project_cache.stats)
+
+# 같은 query 를 동시에 요청하면 LLM 호출 하나를 같이 기다림
+_pending: dict[str, asyncio.Task[tuple[datetime, llm.ProjectGPTResponse | None]]] = {}
+
+
+def project_cache_key(query: str) -> str:
+    """ 
+    LLM 에 보내는 내용이 같으면 같은 key. 
+    모델, 응답 스키마, 시스템 프롬프트와 시각을 고정해서 만든 프롬프트 (query 의 공백은 정리) 로 만듦
+    """
+    normalized = build_project_prompt(" ".join(query.split()), now=datetime.fromtimestamp(0))
+    schema = json.dumps(llm.ProjectGPTResponse.model_json_schema(), sort_keys=True)
+    return hashlib.sha256("\0".join((llm.MODEL, schema, SYSTEM_PROMPT, normalized)).encode()).hexdigest()
+
+
+def _rebase(response: llm.ProjectGPTResponse, generated_at: datetime, now: datetime) -> llm.ProjectGPTResponse:
+    """ 기본값으로 채운 날짜는 프롬프트를 만든 시각 기준이므로 지금 기준으로 옮김. query 에서 뽑은 날짜는 그대로 """
+    if generated_at == now:
+        return response
+    shift = dict(zip(_default_dates(generated_at), _default_dates(now)))
+    return response.model_copy(update={
+        "start_date": shift.get(response.start_date, response.start_date),
+        "end_date": shift.get(response.end_date, response.end_date),
+    })
+
+
+async def _infer_and_store(key: str, prompt: Prompt, now: datetime) -> tuple[datetime, llm.ProjectGPTResponse | None]:
+    response: llm.ProjectGPTResponse | None = await llm.infer(prompt, llm.ResponseOption.PROJECT) # type: ignore
+    if response:
+        project_cache.set(key, (now, response))
+    return now, response
+
+
+async def infer_project(
+    user: User,
+    request_id: uuid.UUID,
+    query: str
+) -> llm.ProjectGPTResponse | None:
+    """ 캐시에 있으면 LLM 을 부르지 않음. 같은 query 가 이미 진행 중이면 그 결과를 같이 씀 """
+    now = datetime.now()
+    key = project_cache_key(query)
+
+    cached = project_cache.get(key)
+    if cached is not None:
+        return _rebase(cached[1], cached[0], now)
+
+    task = _pending.get(key)
+    if task is None:
+        prompt = Prompt(request_id=request_id, user=user, user_prompt=build_project_prompt(query, now))
+        task = asyncio.create_task(_infer_and_store(key, prompt, now))
+        _pending[key] = task
+        task.add_done_callback(lambda _: _pending.pop(key, None))
+
+    # 먼저 요청한 쪽이 취소돼도 같이 기다리는 쪽의 호출은 계속됨
+    generated_at, response = await asyncio.shield(task)
+    return _rebase(response, generated_at, now) if response else None
+
+
+async def _load_thread(db: AsyncSession, user: User) -> Thread:
+    thread = await Thread.get_by_user(db, user.u_id)
+
+    if thread is None:
+        thread = Thread(user_id=user.u_id, messages=[])
+
+    # LLM 응답을 기다리는 동안 DB 커넥션을 쥐고 있지 않도록 트랜잭션을 끝냄
+    await db.commit()
+    return thread
+
+
+async def _save_project(
+    db: AsyncSession,
+    thread: Thread,
+    query: str,
+    parent_id: uuid.UUID | None,
+    response: llm.ProjectGPTResponse
+) -> Project | None:
+    user_message = Message(content=query, role=Role.USER, parent_id=parent_id)
+    thread.add_message(user_message)
+    
+    assistant_message = Message(content=response.content, role=Role.ASSISTANT, parent_id=user_message.u_id)
+    thread.add_message(assistant_message)
+
+    await thread.commit_current(db)
+
+    return await Project.put(
+        db=db, 
+        title=response.title,
+        summary=response.summary,
+        content=response.content,
+        priority=response.priority,
+        category=response.category,
+        start_date=response.start_date,
+        end_date=response.end_date
+    )
+
+
+async def generate_project(
+    db: AsyncSession,
+    user: User,
+    request_id: uuid.UUID,
+    query: str,
+    parent_id: uuid.UUID | None = None,
+) -> uuid.UUID | None:
+    """ query 로 LLM 에게 프로젝트를 만들게 하고, 대화 기록과 프로젝트를 저장. 만든 프로젝트의 u_id 를 반환 """
+    thread = await _load_thread(db, user)
+
+    response = await infer_project(user, request_id, query)
+    if not response:
+        return None
+
+    project = await _save_project(db, thread, query, parent_id, response)
+    return project.u_id if project else None
+
+
+async def stream_project(
+    db: AsyncSession,
+    user: User,
+    request_id: uuid.UUID,
+    query: str,
+    parent_id: uuid.UUID | None = None,
+) -> AsyncIterator[llm.Streaming]:
+    """ 
+    generate_project 의 스트리밍 버전. 생성되는 대로 흘려보내고 끝나면 저장함.
+    응답 본문을 보내는 중에는 요청 세션이 이미 닫혀 있으므로 저장은 새 세션으로 함.
+    캐시에 있으면 done 하나만 보냄
+    """
+    now = datetime.now()
+    key = project_cache_key(query)
+    prompt = Prompt(request_id=request_id, user=user, user_prompt=build_project_prompt(query, now))
+    thread = await _load_thread(db, user)
+
+    async def generated() -> AsyncIterator[llm.Streaming]:
+        cached = project_cache.get(key)
+        if cached is not None:
+            response = _rebase(cached[1], cached[0], now)
+            yield llm.Streaming(status="done", data=response.model_dump(mode="json"), parsed=response)
+            return
+        async for chunk in llm.stream(prompt, llm.ResponseOption.PROJECT):
+            if chunk.status == "done" and chunk.parsed:
+                project_cache.set(key, (now, chunk.parsed))
+            yield chunk
+
+    async def chunks():
+        async for chunk in generated():
+            if chunk.status == "done" and chunk.parsed:
+                async with new_session() as session:
+                    project = await _save_project(session, thread, query, parent_id, chunk.parsed)
+                if project is not None:
+                    chunk = chunk.model_copy(update={"data": {**chunk.data, "u_id": str(project.u_id)}})
+            yield chunk
+
+    return chunks()
+
+
+# Idempotency-Key 로 받은 동기 요청 (key: (유저, Idempotency-Key), value: 처음 요청의 실행)
+_idempotent: TTLCache[tuple[uuid.UUID, str], asyncio.Task[uuid.UUID | None]] = TTLCache(
+    maxsize=settings.IDEMPOTENCY_MAXSIZE,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+metrics.register("project_idempotency", _idempotent.stats)
+
+
+async def _generate_in_new_session(
+    user: User,
+    request_id: uuid.UUID,
+    query: str,
+    parent_id: uuid.UUID | None
+) -> uuid.UUID | None:
+    async with new_session() as db:
+        return await generate_project(db, user, request_id, query, parent_id)
+
+
+async def generate_project_once(
+    user: User,
+    request_id: uuid.UUID,
+    query: str,
+    parent_id: uuid.UUID | None,
+    idempotency_key: str
+) -> uuid.UUID | None:
+    """ 
+    같은 유저가 같은 Idempotency-Key 로 다시 보내면 처음 요청의 결과를 기다려 돌려줌 (다시 생성/저장하지 않음).
+    처음 요청이 예외로 끝났으면 다시 실행함. 
+    처음 요청이 끊겨도 실행이 이어지도록 요청 세션 대신 새 세션을 씀
+    """
+    key = (user.u_id, idempotency_key)
+    task = _idempotent.get(key)
+    if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+        task = asyncio.create_task(_generate_in_new_session(user, request_id, query, parent_id))
+        _idempotent.set(key, task)
+    return await asyncio.shield(task)
+
+
+class ProjectJobPool:
+    """
+    ProjectJob 을 실행하는 워커 풀. 동시에 실행되는 LLM 호출은 workers 개를 넘지 않음.
+    같은 프로세스에서 넣은 작업은 notify 로 바로 깨우고, 다른 프로세스에서 넣은 작업은 poll 주기마다 가져감
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+        self.running = 0
+        self.queue_depth = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.throttled = 0
+        self.errors = 0
+        self.wait_ms_total = 0
+        self.run_ms_total = 0
+        self.last_wait_ms = 0
+        self.last_run_ms = 0
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def notify(self) -> None:
+        """ 작업을 넣었음을 알림. queue_depth 는 다음 claim 때 DB 값으로 다시 맞춰짐 """
+        self.queue_depth += 1
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                async with new_session() as db:
+                    job = await ProjectJob.claim(db)
+                    self.queue_depth = await ProjectJob.queue_depth(db)
+            except Exception as e:
+                print("프로젝트 생성 작업 조회중 오류남: ", e)
+                self.errors += 1
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.PROJECT_JOB_POLL_SECONDS)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: ProjectJob) -> None:
+        self.running += 1
+        started = time.perf_counter()
+        status, error, project_id = JobStatus.FAILED, None, None
+        throttled = False
+        try:
+            async with asyncio.timeout(settings.PROJECT_JOB_TIMEOUT_SECONDS):
+                async with new_session() as db:
+                    user = await User.get_by_id(db, job.user_id)
+                    if user is None:
+                        raise ValueError("유저 정보를 찾을 수 없습니다.")
+                    project_id = await generate_project(db, user, job.u_id, job.query, job.parent_id)
+                    if project_id is not None:
+                        status = JobStatus.SUCCEEDED
+                    else:
+                        error = "LLM 응답이 없습니다."
+        except LimiterTimeout:
+            # RPM/TPM 이 바닥났거나 429 로 멈춘 동안이므로 실패시키지 않고 나중에 다시 시도
+            throttled = True
+        except TimeoutError:
+            error = "제한 시간을 넘었습니다."
+        except Exception as e:
+            error = str(e)
+        finally:
+            self.running -= 1
+
+        if throttled:
+            try:
+                async with new_session() as db:
+                    await ProjectJob.requeue(db, job.u_id, settings.PROJECT_JOB_THROTTLE_DELAY_SECONDS)
+            except Exception as e:
+                print("프로젝트 생성 작업 재대기중 오류남: ", e)
+                self.errors += 1
+            self.throttled += 1
+            return
+
+        try:
+            async with new_session() as db:
+                await ProjectJob.finish(db, job.u_id, status, error, project_id)
+        except Exception as e:
+            print("프로젝트 생성 작업 상태 저장중 오류남: ", e)
+            self.errors += 1
+
+        if status == JobStatus.SUCCEEDED:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+        self.last_run_ms = int((time.perf_counter() - started) * 1000)
+        self.run_ms_total += self.last_run_ms
+        if job.started_at:
+            self.last_wait_ms = int((job.started_at - job.created_at).total_seconds() * 1000)
+            self.wait_ms_total += self.last_wait_ms
+
+    def stats(self) -> dict[str, Any]:
+        finished = self.succeeded + self.failed
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "avg_wait_ms": self.wait_ms_total / finished if finished else 0.0,
+            "avg_run_ms": self.run_ms_total / finished if finished else 0.0,
+            "last_wait_ms": self.last_wait_ms,
+            "last_run_ms": self.last_run_ms,
+        }
+
+
+def create_project_job_pool() -> ProjectJobPool:
+    pool = ProjectJobPool(settings.PROJECT_JOB_WORKERS)
+    metrics.register("project_jobs", pool.stats)
+    return pool
@@ -0,0 +1,283 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Protocol
+
+from pydantic import BaseModel
+
+from app.core import metrics
+from app.core.cache import DiskLRUCache
+from app.core.config import settings
+from app.modules import blob
+from app.modules.blob import AsyncReader
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class SeekableReader(AsyncReader, Protocol):
+    async def seek(self, offset: int) -> Any: ...
+
+
+class StoredFile(BaseModel):
+    size: int
+    etag: str
+    last_modified: datetime
+
+
+async def _read_range(f: BinaryIO, offset: int, length: int | None) -> AsyncIterator[bytes]:
+    await asyncio.to_thread(f.seek, offset)
+    remaining = length
+    while remaining is None or remaining > 0:
+        size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+        chunk = await asyncio.to_thread(f.read, size)
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
+
+async def content_hash(source: SeekableReader) -> tuple[str, int]:
+    """ 업로드 전에 내용의 sha256 과 크기를 계산하고 처음 위치로 되돌림 """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await source.read(settings.BLOB_UPLOAD_BLOCK_SIZE):
+        await asyncio.to_thread(digest.update, chunk)
+        size += len(chunk)
+    await source.seek(0)
+    return digest.hexdigest(), size
+
+
+class Storage(ABC):
+    """
+    첨부파일 저장소 인터페이스.
+    settings.STORAGE_BACKEND 에 따라 Azure Blob 또는 로컬 디스크 구현을 사용함
+    """
+
+    @abstractmethod
+    async def upload(self, name: str, source: AsyncReader) -> StoredFile: ...
+
+    @abstractmethod
+    async def stat(self, name: str) -> StoredFile | None: ...
+
+    @abstractmethod
+    def iter_chunks(
+        self,
+        name: str,
+        offset: int = 0,
+        length: int | None = None,
+        etag: str | None = None
+    ) -> AsyncIterator[bytes]:
+        """ [offset, offset + length) 구간, length 가 None 이면 끝까지 """
+
+    @abstractmethod
+    async def delete(self, name: str) -> bool:
+        """ 삭제 후 파일이 더 이상 없으면 True """
+
+    async def delete_many(self, names: list[str]) -> list[bool]:
+        """ 이름 순서대로 delete 결과 """
+        results = await asyncio.gather(*(self.delete(name) for name in names), return_exceptions=True)
+        return [result is True for result in results]
+
+    @abstractmethod
+    def list_files(self) -> AsyncIterator[tuple[str, datetime]]:
+        """ 저장된 모든 파일의 (이름, 마지막 수정 시각) """
+
+    def local_path(self, name: str) -> Path | None:
+        """ 디스크에 그대로 있는 파일이면 경로 (FileResponse 로 직접 내보낼 수 있음) """
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class AzureStorage(Storage):
+
+    def __init__(self):
+        self.service = blob.create_blob_service()
+
+    async def upload(self, name: str, source: AsyncReader) -> StoredFile:
+        meta = await blob.upload_blob_stream(self.service, name, source)
+        return StoredFile(size=meta["size"], etag=meta["etag"], last_modified=meta["last_modified"])
+
+    async def stat(self, name: str) -> StoredFile | None:
+        props = await blob.get_blob_properties(self.service, name)
+        if props is None:
+            return None
+        return StoredFile(size=props.size, etag=props.etag, last_modified=props.last_modified)
+
+    def iter_chunks(self, name, offset=0, length=None, etag=None):
+        return blob.iter_blob_chunks(self.service, name, offset=offset, length=length, etag=etag)
+
+    async def delete(self, name: str) -> bool:
+        return await blob.delete_blob(self.service, name)
+
+    async def delete_many(self, names: list[str]) -> list[bool]:
+        return await blob.delete_blobs(self.service, names)
+
+    async def list_files(self):
+        async for props in blob.list_blobs(self.service):
+            yield props.name, props.last_modified
+
+    async def close(self) -> None:
+        await self.service.close()
+
+
+class LocalStorage(Storage):
+    """
+    root 디렉터리 아래에 blob 이름 그대로 저장.
+    업로드는 같은 디렉터리의 임시 파일에 쓴 뒤 rename 하므로 읽는 쪽에서 쓰다 만 파일을 보지 않음
+    """
+    def __init__(self, root: str = settings.LOCAL_STORAGE_ROOT):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if path.parent != self.root:
+            raise ValueError(f"Invalid file name: {name}")
+        return path
+
+    @staticmethod
+    def _etag(st: os.stat_result) -> str:
+        # starlette FileResponse 와 같은 방식이어야 If-Range 비교가 맞음
+        etag_base = f"{st.st_mtime}-{st.st_size}"
+        return f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+    def _to_stored(self, st: os.stat_result) -> StoredFile:
+        return StoredFile(
+            size=st.st_size,
+            etag=self._etag(st),
+            last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    async def upload(self, name: str, source: AsyncReader) -> StoredFile:
+        path = self._path(name)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := await source.read(settings.BLOB_UPLOAD_BLOCK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+                await asyncio.to_thread(os.fsync, f.fileno())
+            await asyncio.to_thread(os.replace, tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return self._to_stored(await asyncio.to_thread(path.stat))
+
+    async def stat(self, name: str) -> StoredFile | None:
+        try:
+            st = await asyncio.to_thread(self._path(name).stat)
+        except FileNotFoundError:
+            return None
+        return self._to_stored(st)
+
+    async def iter_chunks(self, name, offset=0, length=None, etag=None):
+        path = self._path(name)
+        with await asyncio.to_thread(open, path, "rb") as f:
+            if etag is not None and self._etag(os.fstat(f.fileno())) != etag:
+                raise FileNotFoundError(f"{name} has been modified")
+            async for chunk in _read_range(f, offset, length):
+                yield chunk
+
+    async def delete(self, name: str) -> bool:
+        await asyncio.to_thread(self._path(name).unlink, missing_ok=True)
+        return True
+
+    async def list_files(self):
+        entries = await asyncio.to_thread(lambda: list(os.scandir(self.root)))
+        for entry in entries:
+            # 업로드 중인 임시 파일 제외
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            try:
+                st = await asyncio.to_thread(entry.stat)
+            except FileNotFoundError:
+                continue
+            yield entry.name, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+
+    def local_path(self, name: str) -> Path | None:
+        return self._path(name)
+
+
+class CachedStorage(Storage):
+    """
+    원격 저장소 앞단의 디스크 read-through 캐시 (key: 파일 이름 + ETag).
+    ETag 가 바뀌면 다른 key 가 되므로 덮어쓴 파일의 예전 내용이 나가지 않음.
+    전체 다운로드일 때만 캐시를 채우고, Range 요청은 캐시에 있으면 캐시에서 읽음
+    """
+
+    def __init__(self, inner: Storage, cache: DiskLRUCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def upload(self, name: str, source: AsyncReader) -> StoredFile:
+        return await self.inner.upload(name, source)
+
+    async def stat(self, name: str) -> StoredFile | None:
+        return await self.inner.stat(name)
+
+    async def iter_chunks(self, name, offset=0, length=None, etag=None):
+        if etag is None:
+            async for chunk in self.inner.iter_chunks(name, offset=offset, length=length):
+                yield chunk
+            return
+
+        f = await asyncio.to_thread(self.cache.open, name, etag)
+        if f is not None:
+            with f:
+                async for chunk in _read_range(f, offset, length):
+                    self.cache.bytes_saved += len(chunk)
+                    yield chunk
+            return
+
+        writer = None
+        if offset == 0 and length is None:
+            try:
+                writer = await asyncio.to_thread(self.cache.writer, name, etag)
+            except OSError:
+                pass
+
+        try:
+            async for chunk in self.inner.iter_chunks(name, offset=offset, length=length, etag=etag):
+                if writer is not None:
+                    await asyncio.to_thread(writer.write, chunk)
+                yield chunk
+            if writer is not None:
+                await asyncio.to_thread(writer.commit)
+        finally:
+            if writer is not None:
+                writer.abort()
+
+    async def delete(self, name: str) -> bool:
+        await asyncio.to_thread(self.cache.invalidate, name)
+        return await self.inner.delete(name)
+
+    async def delete_many(self, names: list[str]) -> list[bool]:
+        for name in names:
+            await asyncio.to_thread(self.cache.invalidate, name)
+        return await self.inner.delete_many(names)
+
+    def list_files(self):
+        return self.inner.list_files()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+def create_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage()
+
+    storage: Storage = AzureStorage()
+    if settings.BLOB_CACHE_DIR:
+        cache = DiskLRUCache(settings.BLOB_CACHE_DIR, settings.BLOB_CACHE_MAX_BYTES)
+        cache.evict()
+        metrics.register("blob_disk_cache", cache.stats)
+        storage = CachedStorage(storage, cache)
+    return storage
@@ -2,11 +2,13 @@ from .dashboard import dashboard_r
 from .user import user_r
 from .bizcards import bizcard_r
 from .program import program_r
+from .metrics import metrics_r
 
 
 __all__ = [
     'dashboard_r', 
     'user_r',
     'bizcard_r',
-    'program_r'
+    'program_r',
+    'metrics_r'
 ]
\ No newline at end of file
@@ -13,9 +13,12 @@ from app.models import (
     GetBizcardDetailResponse,
     ProgramDTO
 )
+from app.core.db import new_session
+from app.core.stream import NDJSON_RESPONSES, ndjson_response
 from app.deps import (
     RequestDep, 
     SessionDep, 
+    StreamDep,
     UserDep
 )
 
@@ -23,11 +26,23 @@ bizcard_r = APIRouter()
 
 CONTAINER_NAME = "biz-cards"
 
-@bizcard_r.get("", response_model=GetBizcardsResponse)
+
+def _to_dto(client: BizClient) -> BizClientDTO:
+    return BizClientDTO(
+        u_id=client.u_id,
+        category=client.category,
+        blob_file_name=client.blob_file_name,
+        origin_file_name=client.origin_file_name,
+        biz_card=BusinessCard.model_validate(client.biz_card)
+    )
+
+
+@bizcard_r.get("", response_model=GetBizcardsResponse, responses=NDJSON_RESPONSES)
 async def get_bizcards(
     request_id: RequestDep,
     me: UserDep,
     db: SessionDep,
+    stream: StreamDep,
 
     query: str | None = Query(None),
     order_by: OrderBy | None = Query(None),
@@ -35,7 +50,16 @@ async def get_bizcards(
     limit: int = Query(10),
 
 ):
-    bizclients = BizClient.filter(
+    if stream:
+        # 의존성 세션은 응답 전송 전에 닫히므로 스트림 전용 세션을 사용
+        async def rows():
+            async with new_session() as session:
+                async for client in BizClient.stream_filter(session, query, order_by):
+                    yield _to_dto(client)
+
+        return ndjson_response(rows())
+
+    bizclients = await BizClient.filter(
         db,
         query,
         order_by,
@@ -43,15 +67,7 @@ async def get_bizcards(
         limit
     )
 
-    biz_dtos = []
-    for client in bizclients:
-        biz_dtos.append(BizClientDTO(
-            u_id=client.u_id,
-            category=client.category,
-            blob_file_name=client.blob_file_name,
-            origin_file_name=client.origin_file_name,
-            biz_card=BusinessCard.model_validate(client.biz_card)
-        ))
+    biz_dtos = [_to_dto(client) for client in bizclients]
 
     return GetBizcardsResponse(bizcards=biz_dtos)
 
@@ -71,13 +87,13 @@ async def put_bizcard(
         company=body.biz_card.biz_card.company,
         phone_number=body.biz_card.biz_card.phone_number
     )
-    updated = BizClient.update_bizcard(
+    updated = await BizClient.update_bizcard(
         db,
         body.u_id,
         bizcard
     )
 
-    return PutBizcardsResponse(status=updated)
+    return PutBizcardsResponse(status=updated is not None)
 
 @bizcard_r.get("/detail", response_model=GetBizcardDetailResponse)
 async def get_bizcard_detail(
@@ -86,20 +102,14 @@ async def get_bizcard_detail(
     db: SessionDep,
     u_id: uuid.UUID
 ):
-    bizclient = BizClient.get_by_id(db, u_id)
-    programs = Program.get_by_client_id(db, u_id)
+    bizclient = await BizClient.get_by_id(db, u_id)
+    programs = await Program.get_by_client_id(db, u_id)
     
     if not bizclient:
         return None
     
     return GetBizcardDetailResponse(
-        biz_card=BizClientDTO(
-            u_id=bizclient.u_id,
-            category=bizclient.category,
-            blob_file_name=bizclient.blob_file_name,
-            origin_file_name=bizclient.origin_file_name,
-            biz_card=BusinessCard.model_validate(bizclient.biz_card)
-        ),
+        biz_card=_to_dto(bizclient),
         programs=[ProgramDTO(
             u_id=program.u_id,
             client_u_id=program.client_u_id,
@@ -1,186 +1,257 @@
+import asyncio
+import time
 import uuid
-import io
+from email.utils import format_datetime
 from fastapi import (
     APIRouter, 
+    Header,
+    HTTPException,
     Query,
+    Request,
     UploadFile,
     File,
     Form,
 )
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from typing import Annotated
-from datetime import datetime, timedelta
 from urllib.parse import quote
+from app.core.db import new_session
+from app.core.ratelimit import LimiterTimeout
+from app.core.stream import NDJSON_RESPONSES, SSE_RESPONSES, ndjson_response, sse_event, sse_response
 from app.deps import (
     RequestDep, 
     SessionDep,
+    StreamDep,
     UserDep,
-    BlobClientDep
+    StorageDep,
+    JobDep,
+    ProjectJobPoolDep,
+    IdempotencyKeyDep,
 )
 from app.models import (
     ProjectCategory, 
     ProjectPriority, 
     ProjectDateFilter,
     PostCreateProjectRequest,
-    Prompt,
     GetDashboardResponse,
     PostCreateProjectResponse,
     Project,
-    Thread,
-    Message,
-    Role,
     PutModifyProjectRequest,
     PutModifyProjectResponse,
     PostDashboardUploadFileResponse,
     DeleteDashboardResponse,
     ProjectDTO,
     ProjectProgressResponse,
-    ProjectProgress
+    ProjectProgress,
+    GetDashboardStatsResponse,
+    StoredBlob,
+    ProjectJob,
+    PostCreateProjectJobResponse,
+    GetProjectJobResponse,
 )
-from app.modules import llm, blob
+from app.modules.project_jobs import generate_project, generate_project_once, stream_project
+from app.modules.storage import content_hash
 
 
 dashboard_r = APIRouter()
 
-@dashboard_r.get("", response_model=GetDashboardResponse)
+
+def _to_dto(p: Project) -> ProjectDTO:
+    return ProjectDTO(
+        u_id=p.u_id,
+        title=p.title,
+        summary=p.summary,
+        content=p.content,
+        priority=p.priority,
+        category=p.category,
+        start_date=p.start_date,
+        end_date=p.end_date,
+        file_id=p.file_id,
+        file_name=p.file_name,
+        original_file_name=p.original_file_name,
+    )
+
+
+@dashboard_r.get("", response_model=GetDashboardResponse, responses=NDJSON_RESPONSES)
 async def get_dashboard(
     request_id: RequestDep,
     me: UserDep,
     db: SessionDep,
+    stream: StreamDep,
     category: ProjectCategory | None = Query(None),
     priority: ProjectPriority | None = Query(None),
     query: str | None = Query(None),
     date_filter: ProjectDateFilter | None = Query(None),
     offset: int = Query(0),
-    limit: int = Query(10)
+    limit: int = Query(10),
+    cursor: str | None = Query(None),
 
     # me = Depends(get_current_user)
 ):
-    projects = Project.filter(
+    if stream:
+        # 의존성 세션은 응답 전송 전에 닫히므로 스트림 전용 세션을 사용
+        async def rows():
+            async with new_session() as session:
+                async for p in Project.stream_filter(session, category, priority, query, date_filter):
+                    yield _to_dto(p)
+
+        return ndjson_response(rows())
+
+    try:
+        projects = await Project.filter(
+            db,
+            category,
+            priority,
+            query,
+            date_filter,
+            offset,
+            limit,
+            cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    projects_dto=[_to_dto(p) for p in projects]
+
+    return GetDashboardResponse(
+        projects=projects_dto,
+        # 유사도 순으로 정렬된 검색 결과는 keyset 커서로 이어갈 수 없음
+        next_cursor=None if query and not cursor and Project.ranks_search(query) else Project.next_cursor(projects, limit)
+    )
+
+@dashboard_r.get("/progress", response_model=ProjectProgressResponse, responses=NDJSON_RESPONSES)
+async def get_project_progress(
+    request_id: RequestDep,
+    me: UserDep,
+    db: SessionDep,
+    stream: StreamDep,
+    category: ProjectCategory | None = Query(None),
+    priority: ProjectPriority | None = Query(None),
+    query: str | None = Query(None),
+    date_filter: ProjectDateFilter | None = Query(None),
+    offset: int = Query(0),
+    limit: int | None = Query(None),
+):
+    if stream:
+        async def progresses():
+            async with new_session() as session:
+                async for row in Project.stream_progress(session, category, priority, query, date_filter):
+                    yield ProjectProgress.model_validate(row._mapping)
+
+        return ndjson_response(progresses())
+
+    rows = await Project.get_progress(
         db,
         category,
         priority,
         query,
         date_filter,
         offset,
-        limit 
+        limit
     )
 
-    projects_dto=[
-        ProjectDTO(
-            u_id=p.u_id,
-            title=p.title,
-            summary=p.summary,
-            content=p.content,
-            priority=p.priority,
-            category=p.category,
-            start_date=p.start_date,
-            end_date=p.end_date,
-            file_id=p.file_id,
-            file_name=p.file_name,
-            original_file_name=p.original_file_name,
-        ) for p in projects
-    ]
-
-    return GetDashboardResponse(projects=projects_dto)
-
-@dashboard_r.get("/progress", response_model=ProjectProgressResponse)
-async def get_project_progress(
-    request_id: RequestDep,
-    me: UserDep,
-    db: SessionDep
-):
-    projects = Project.get_all(db)
-
     return ProjectProgressResponse(
-        projects=[
-            ProjectProgress(
-                u_id=project.u_id,
-                title=project.title,
-                priority=project.priority,
-                category=project.category,
-                start_date=project.start_date,
-                end_date=project.end_date,
-                progress=project.progress
-            )
-            for project in projects
-        ]
+        projects=[ProjectProgress.model_validate(row._mapping) for row in rows]
     )
 
 
 
 
 
-@dashboard_r.post("/create", response_model=PostCreateProjectResponse)
+@dashboard_r.get("/stats", response_model=GetDashboardStatsResponse)
+async def get_dashboard_stats(
+    request_id: RequestDep,
+    me: UserDep,
+    db: SessionDep
+):
+    stats = await Project.stats(db)
+    return GetDashboardStatsResponse(stats=stats)
+
+
+@dashboard_r.post("/create", response_model=PostCreateProjectResponse, responses={
+    202: {"model": PostCreateProjectJobResponse, "description": "job=true 또는 Prefer: respond-async 일 때"}
+})
 async def create_project(
     request_id: RequestDep,
+    request: Request,
     db: SessionDep,
     me: UserDep,
+    as_job: JobDep,
+    jobs: ProjectJobPoolDep,
+    idempotency_key: IdempotencyKeyDep,
     body: PostCreateProjectRequest
 ):
-    raw: str = f"""
-    ## Persona
-    당신은 좋은 프로젝트를 만들기 위해 노력하는 프로젝트 매니저입니다.
-
-    ## 목표
-    1. 당신의 목표는 <query>를 바탕으로 프로젝트의 메타데이터와 내용을 생성하는 것입니다. 프로젝트의 메타데이터는 프로젝트의 카테고리, 우선순위, 날짜 필터 등을 포함합니다.
-    2. <query>에서 프로젝트에 대한 정보를 최대한 추출해야합니다. 만약 <query>에서 프로젝트의 데이터를 추출할 수 없다면, <default> 값을 참고해서 생성하세요. 
-
-    ## 참고
-    - title은 프로젝트의 제목입니다.
-    - summary는 프로젝트 내용의 요약입니다.
-    - content는 프로젝트 내용입니다.
-    
-    - priority는 프로젝트의 우선순위입니다. 
-    - category는 프로젝트의 카테고리입니다.
-
-    - start_date는 프로젝트의 시작 날짜입니다.
-    - end_date는 프로젝트의 종료 날짜입니다.
+    """ Idempotency-Key 헤더를 보내면 같은 key 로 다시 보낸 요청은 처음 요청의 결과(또는 작업)를 그대로 받음 """
+    if as_job:
+        # 바로 202 를 주고 워커 풀에서 생성. 결과는 /create/jobs/{job_id} 로 조회
+        job = await ProjectJob.create(db, me.u_id, body.query, body.parent_id, idempotency_key)
+        jobs.notify()
+        return JSONResponse(
+            status_code=202,
+            content=PostCreateProjectJobResponse(request_id=request_id, job=job.to_dto()).model_dump(mode="json"),
+            headers={"Location": str(request.url_for("get_project_job", job_id=job.u_id))}
+        )
 
-    - <default>
-        - title: 제목 없음
-        - summary: 요약 없음
-        - content: 내용 없음
-        - priority: LOW
-        - category: SHORT_TERM
-        - start_date: {int(datetime.now().timestamp())}
-        - end_date: {int((datetime.now() + timedelta(days=7)).timestamp())}
+    try:
+        if idempotency_key is not None:
+            project_id = await generate_project_once(me, request_id, body.query, body.parent_id, idempotency_key)
+        else:
+            project_id = await generate_project(db, me, request_id, body.query, body.parent_id)
+    except LimiterTimeout as e:
+        # LLM 호출 대기열이 밀려 있음. 잠시 후 다시 시도하거나 job 으로 요청
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
 
-    ## <query>
+    return PostCreateProjectResponse(status=project_id is not None, project_id=project_id)
 
-    {body.query}
 
+@dashboard_r.post("/create/stream", response_class=StreamingResponse, responses=SSE_RESPONSES)
+async def create_project_stream(
+    request_id: RequestDep,
+    db: SessionDep,
+    me: UserDep,
+    body: PostCreateProjectRequest
+):
     """
-    prompt = Prompt(request_id=request_id, user=me, user_prompt=raw)
+    생성 과정을 server-sent events 로 보냄.
+    - delta: 새로 도착한 부분 (title/summary/content 는 이어 붙일 텍스트, priority/category 등 나머지는 다 만들어진 값 전체)
+    - done: 완성된 프로젝트 (저장된 프로젝트의 u_id 포함). 이 시점에 Thread/Project 가 저장됨
+    - error: 생성 또는 저장 실패
+    """
+    chunks = await stream_project(db, me, request_id, body.query, body.parent_id)
 
-    thread = Thread.get_by_user(db, me.u_id)
+    async def events():
+        try:
+            async for chunk in chunks:
+                if chunk.status == "partial":
+                    yield sse_event("delta", chunk.data)
+                else:
+                    yield sse_event("done", {"status": chunk.parsed is not None, "project": chunk.data})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
 
-    if thread is None:
-        thread = Thread(user_id=me.u_id, messages=[])
+    return sse_response(events())
 
-    response: llm.ProjectGPTResponse | None = await llm.infer(prompt, llm.ResponseOption.PROJECT) # type: ignore
 
-    if response:
-        user_message = Message(content=body.query, role=Role.USER, parent_id=body.parent_id)
-        thread.add_message(user_message)
+@dashboard_r.get("/create/jobs/{job_id}", response_model=GetProjectJobResponse)
+async def get_project_job(
+    request_id: RequestDep,
+    db: SessionDep,
+    me: UserDep,
+    job_id: uuid.UUID,
+    wait: float = Query(0, ge=0, le=30, description="끝날 때까지 최대 wait 초 기다렸다 응답 (long polling)")
+):
+    deadline = time.monotonic() + wait
+    while True:
+        job = await ProjectJob.get(db, job_id, me.u_id)
+        # 기다리는 동안 커넥션을 쥐고 있지 않도록 트랜잭션을 끝냄
+        await db.commit()
+
+        if job is None:
+            raise HTTPException(status_code=404, detail="No found")
+        if job.done or time.monotonic() >= deadline:
+            return GetProjectJobResponse(request_id=request_id, job=job.to_dto())
         
-        assistant_message = Message(content=response.content, role=Role.ASSISTANT, parent_id=user_message.u_id)
-        thread.add_message(assistant_message)
-
-        thread.commit_current(db)
-
-        Project.put(
-            db=db, 
-            title=response.title,
-            summary=response.summary,
-            content=response.content,
-            priority=response.priority,
-            category=response.category,
-            start_date=response.start_date,
-            end_date=response.end_date
-        )
-
-    return PostCreateProjectResponse(status=bool(response))
+        await asyncio.sleep(0.5)
     
 
 @dashboard_r.put("/modify", response_model=PutModifyProjectResponse)
@@ -191,7 +262,7 @@ async def modify_project(
     body: PutModifyProjectRequest
 ):
     
-    Project.put(
+    project = await Project.put(
         db,         
         title=body.title,
         summary=body.summary,
@@ -203,7 +274,7 @@ async def modify_project(
         u_id=body.u_id,
     )
 
-    return PutModifyProjectResponse(request_id=request_id, status=True)
+    return PutModifyProjectResponse(request_id=request_id, status=project is not None)
 
 
 @dashboard_r.delete("/delete", response_model=DeleteDashboardResponse)
@@ -211,18 +282,14 @@ async def delete_project(
     request_id: RequestDep,
     db: SessionDep,
     me: UserDep,
-    blob_client: BlobClientDep,
     u_id: Annotated[uuid.UUID, Query(...)]
 ):
-    one = Project.get_one(db, u_id)
+    one = await Project.get_one(db, u_id)
 
     if one is None:
         raise ValueError("No found")
-    
-    if one.file_name:
-        blob.delete_blob(blob_client, one.file_name)
 
-    deleted = Project.delete(db, u_id)
+    deleted = await StoredBlob.delete_project(db, u_id)
 
     return DeleteDashboardResponse(status=deleted)
 
@@ -232,24 +299,66 @@ async def upload_file(
     request_id: RequestDep,
     me: UserDep,
     db: SessionDep,
-    blob_client: BlobClientDep,
+    storage: StorageDep,
     u_id: Annotated[uuid.UUID, Form(...)],
     file: Annotated[UploadFile, File(...)]
 ):
     if file.filename is None:
         raise ValueError("No file name")
+
+    one = await Project.get_one(db, u_id)
+    if one is None:
+        raise ValueError("No found")
     
     random_file_id = uuid.uuid4()
-    extension = file.filename.split(".")[-1]
-    blob_name = f"{str(random_file_id)}.{extension}"
-    file_bytes = file.file.read()
 
-    meta = blob.upload_blob_stream(blob_client, blob_name, io.BytesIO(file_bytes))
+    # 같은 내용이 이미 저장돼 있으면 올리지 않고 그 blob 을 같이 씀
+    sha256, size = await content_hash(file)
+    blob_name = await StoredBlob.attach_existing(db, u_id, sha256, random_file_id, file.filename)
+    if blob_name is None:
+        extension = file.filename.split(".")[-1]
+        blob_name = f"{str(random_file_id)}.{extension}"
+
+        # UploadFile 의 임시 파일에서 블록 단위로 읽어 올림 (파일 전체를 메모리에 올리지 않음)
+        await storage.upload(blob_name, file)
+        await StoredBlob.attach_new(db, u_id, sha256, blob_name, size, random_file_id, file.filename)
 
-    if meta:
-        Project.put_file(db, u_id, random_file_id, blob_name, file.filename)
+    return PostDashboardUploadFileResponse(status=True)
 
-    return PostDashboardUploadFileResponse(status=bool(meta))
+
+def _parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """ 
+    "bytes=start-end" 형태의 단일 Range 를 [start, end] 로 변환.
+    해석할 수 없거나 (끝이 시작보다 앞인 구간 포함) 여러 구간이면 None (전체 응답), 시작이 크기를 벗어나면 416
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            # 마지막 n 바이트
+            suffix = int(last)
+            if suffix <= 0:
+                raise ValueError
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if first and last and end < start:
+        # RFC 9110: 끝이 시작보다 앞인 range-spec 은 잘못된 것이므로 무시
+        return None
+    if start >= size:
+        raise HTTPException(
+            status_code=416, 
+            detail="Range Not Satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
 
 
 @dashboard_r.get("/download_file", response_class=StreamingResponse, responses={200: {"content": {
@@ -259,15 +368,17 @@ async def upload_file(
       "format": "binary"
     }
   }
-}}})
+}}, 206: {"description": "Partial Content"}})
 async def download_file(
     request_id: RequestDep,
     me: UserDep,
     db: SessionDep,
-    blob_client: BlobClientDep,
+    storage: StorageDep,
     u_id: Annotated[uuid.UUID, Query(...)],
+    range_header: Annotated[str | None, Header(alias="Range")] = None,
+    if_range: Annotated[str | None, Header()] = None,
 ):
-    one = Project.get_one(db, u_id)
+    one = await Project.get_one(db, u_id)
 
     if one is None:
         raise ValueError("No found")
@@ -275,18 +386,49 @@ async def download_file(
     if one.file_name is None:
         raise ValueError("No file name")
 
-    file_stream = blob.download_blob_to_stream(blob_client, one.file_name)
-    if file_stream is None:
+    stored = await storage.stat(one.file_name)
+    if stored is None:
         raise ValueError("No found")
 
+    size = stored.size
+    etag = stored.etag
+    last_modified = format_datetime(stored.last_modified, usegmt=True)
+
     filename = one.original_file_name or "file"
     encoded_filename = quote(filename)
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified,
+    }
+
+    byte_range = None
+    # If-Range 가 현재 버전과 다르면 Range 를 무시하고 전체를 보냄
+    if range_header and (if_range is None or if_range in (etag, last_modified)):
+        byte_range = _parse_range(range_header, size)
+
+    path = storage.local_path(one.file_name)
+    if path is not None:
+        # 로컬 디스크는 FileResponse 가 Range/If-Range 를 직접 처리하며 파일에서 바로 내보냄
+        return FileResponse(path, media_type="application/octet-stream", headers=headers)
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+
     return StreamingResponse(
-        file_stream,
+        # 전체 요청은 length=None 으로 넘겨 캐시가 채워질 수 있게 함
+        storage.iter_chunks(one.file_name, offset=start, length=length if byte_range else None, etag=etag),
+        status_code=status_code,
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-        }
+        headers=headers
     )
 
 
@@ -295,10 +437,9 @@ async def delete_file(
     request_id: RequestDep,
     me: UserDep,
     db: SessionDep,
-    blob_client: BlobClientDep,
     u_id: Annotated[uuid.UUID, Query(...)],
 ):
-    one = Project.get_one(db, u_id)
+    one = await Project.get_one(db, u_id)
 
     if one is None:
         raise ValueError("No found")
@@ -306,12 +447,6 @@ async def delete_file(
     if one.file_name is None:
         raise ValueError("No file name")
 
-    exist = blob.delete_blob(blob_client, one.file_name)
-
-    if exist is None:
-        Project.put_file(db, u_id, None, None, None)
-        status = True
-    else:
-        status = False
+    await StoredBlob.detach(db, u_id)
 
-    return DeleteDashboardResponse(status=status)
+    return DeleteDashboardResponse(status=True)
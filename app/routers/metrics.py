@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+from app.core import metrics
+from app.models import GetMetricsResponse
+from app.deps import (
+    RequestDep,
+    UserDep
+)
+
+metrics_r = APIRouter()
+
+@metrics_r.get("", response_model=GetMetricsResponse)
+async def get_metrics(
+    request_id: RequestDep,
+    me: UserDep,
+):
+    return GetMetricsResponse(metrics=metrics.snapshot())
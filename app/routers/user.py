@@ -11,7 +11,7 @@ from app.models import (
     UType,
 )
 from app.deps import (
-    Session, 
+    AsyncSession, 
     get_db, 
     get_current_user
 )
@@ -19,9 +19,9 @@ from app.deps import (
 user_r = APIRouter()
 
 @user_r.post("/sign_up", response_model=UserDTO)
-async def sign_up(new_user: UserCreate, db: Session = Depends(get_db)):
+async def sign_up(new_user: UserCreate, db: AsyncSession = Depends(get_db)):
     
-    created = User.create(db, user=new_user)
+    created = await User.create(db, user=new_user)
     if created:
         return UserDTO(
             u_id=created.u_id, 
@@ -34,14 +34,14 @@ async def sign_up(new_user: UserCreate, db: Session = Depends(get_db)):
     raise HTTPException(status_code=500, detail="User already exists")
 
 @user_r.post("/sign_in", response_model=Token)
-async def sign_in(user: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session = Depends(get_db)):
+async def sign_in(user: Annotated[OAuth2PasswordRequestForm, Depends()], db: AsyncSession = Depends(get_db)):
     
-    me = User.get(db, user.username)
+    me = await User.get(db, user.username)
 
     if not me:
         raise HTTPException(status_code=500, detail="User not found")
     
-    if me.verify(user.password):
+    if await me.verify(user.password):
         token = Token.new(me)
         return token
     else:
@@ -0,0 +1,93 @@
+"""
+blob 조회 지연: 요청마다 클라이언트를 만드는 예전 방식과 공유 aio 클라이언트 (create_blob_service) 비교.
+
+    azurite-blob --loose &
+    AZURE_BLOB_KEY="<Azurite 연결 문자열>" AZURE_BLOB_CONTAINER=bench python -m scripts.bench_blob
+
+요청 하나는 get_blob_properties + download_blob (--size KB) 로 /download_file 과 같은 호출을 흉내냄.
+- per-request sync: 예전 deps.get_blob_client 처럼 요청마다 sync 클라이언트를 만들어 이벤트 루프에서 바로 호출
+- shared aio: 앱 시작 시 한 번 만든 aio 클라이언트를 모든 요청이 같이 씀
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from azure.core.exceptions import ResourceExistsError
+from azure.storage.blob import BlobServiceClient as SyncBlobServiceClient
+from azure.storage.blob.aio import BlobServiceClient
+
+from app.core.config import settings
+from app.modules.blob import create_blob_service
+from scripts.bench_concurrency import summary
+
+BLOB_NAME = "bench-blob.bin"
+
+
+def fetch_sync(container: str) -> None:
+    service = SyncBlobServiceClient.from_connection_string(settings.AZURE_BLOB_KEY) # type: ignore
+    with service:
+        blob_client = service.get_blob_client(container=container, blob=BLOB_NAME)
+        blob_client.get_blob_properties()
+        blob_client.download_blob().readall()
+
+
+async def fetch_per_request(service: BlobServiceClient, container: str) -> None:
+    # 예전 핸들러처럼 루프를 막는 sync 호출
+    fetch_sync(container)
+
+
+async def fetch_shared(service: BlobServiceClient, container: str) -> None:
+    blob_client = service.get_blob_client(container=container, blob=BLOB_NAME)
+    await blob_client.get_blob_properties()
+    await (await blob_client.download_blob()).readall()
+
+
+async def run(fetch, service: BlobServiceClient, container: str, concurrency: int, requests: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            await fetch(service, container)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def bench(args: argparse.Namespace) -> None:
+    container = settings.AZURE_BLOB_CONTAINER or ""
+    service = create_blob_service()
+    try:
+        try:
+            await service.create_container(container)
+        except ResourceExistsError:
+            pass
+        await service.get_blob_client(container=container, blob=BLOB_NAME).upload_blob(
+            os.urandom(args.size * 1024), overwrite=True
+        )
+
+        print(f"{'mode':<18} {'concurrency':>11} {'req/s':>8}  latency")
+        for concurrency in args.concurrency:
+            for mode, fetch in (("per-request sync", fetch_per_request), ("shared aio", fetch_shared)):
+                await run(fetch, service, container, concurrency, args.warmup)
+                latencies, elapsed = await run(fetch, service, container, concurrency, args.requests)
+                print(f"{mode:<18} {concurrency:>11} {len(latencies) / elapsed:>8.1f}  {summary(latencies)}")
+    finally:
+        await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--size", type=int, default=64, help="테스트 blob 크기 (KB)")
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
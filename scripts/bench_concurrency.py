@@ -0,0 +1,102 @@
+"""
+동시 요청 수에 따른 응답 지연 (p50/p95/p99) 측정.
+
+    python -m scripts.seed --projects 10000
+    uvicorn app.main:app --port 8000
+    python -m scripts.bench_concurrency --concurrency 50 200 500 --path /api/v1/dashboard
+
+FIRST_SUPERUSER 계정으로 로그인한 토큰을 모든 요청에 붙임.
+변경 전/후 비교는 같은 데이터로 각 커밋의 서버를 띄워 같은 명령을 실행함.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(latencies: list[float]) -> str:
+    return " ".join(
+        f"p{p}={percentile(latencies, p) * 1000:.1f}ms" for p in (50, 95, 99)
+    )
+
+
+async def sign_in(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post(
+        "/api/v1/users/sign_in",
+        data={"username": username, "password": password},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    paths: list[str],
+    concurrency: int,
+    requests: int,
+) -> tuple[list[float], Counter, float]:
+    """ concurrency 개의 작업이 requests 개의 요청을 나눠 보냄. (지연 목록, 실패 종류별 수, 걸린 시간) """
+    latencies: list[float] = []
+    errors: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get(paths[i % len(paths)])
+                if response.status_code >= 400:
+                    errors[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def bench(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        token = await sign_in(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        await run_level(client, args.path, min(args.concurrency), args.warmup)
+
+        print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'req/s':>8}  latency")
+        for concurrency in args.concurrency:
+            latencies, errors, elapsed = await run_level(client, args.path, concurrency, args.requests)
+            print(f"{concurrency:>11} {len(latencies):>8} {errors.total():>6} {len(latencies) / elapsed:>8.1f}  {summary(latencies)}")
+            if errors:
+                print(f"{'':>11} errors: {dict(errors)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default=os.getenv("FIRST_SUPERUSER", "admin"))
+    parser.add_argument("--password", default=os.getenv("FIRST_SUPERUSER_PASSWORD", ""))
+    parser.add_argument("--path", action="append", help="여러 번 주면 번갈아 요청함 (기본: /api/v1/dashboard)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--requests", type=int, default=2000, help="동시성 단계마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+    args.path = args.path or ["/api/v1/dashboard"]
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+LLM 호출 지연: 호출마다 AsyncOpenAI 를 만드는 예전 방식과 공유 클라이언트 (llm.get_client) 비교.
+
+    python -m scripts.bench_llm_client --requests 300 --concurrency 1 16
+
+같은 프로세스에 OpenAI 호환 가짜 서버 (scripts.fake_openai) 를 띄우고 structured output 호출을 보냄.
+- per-call client: 예전 llm.infer 처럼 호출마다 클라이언트를 만들고 끝나면 닫음
+- shared client: 프로세스에서 한 번 만든 클라이언트를 모든 호출이 같이 씀
+실제 API 는 TLS 핸드셰이크까지 더해지므로 차이가 더 커짐
+"""
+import argparse
+import asyncio
+import time
+
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.modules import llm
+from scripts.bench_concurrency import summary
+from scripts.fake_openai import FakeOpenAI
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+async def call(client: AsyncOpenAI) -> None:
+    await client.beta.chat.completions.parse(
+        model=llm.MODEL,
+        messages=MESSAGES, # type: ignore
+        response_format=llm.BaseGPTResponse,
+    )
+
+
+async def fetch_per_call(base_url: str) -> None:
+    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=base_url)
+    try:
+        await call(client)
+    finally:
+        await client.close()
+
+
+async def fetch_shared(base_url: str) -> None:
+    await call(llm.get_client())
+
+
+async def run(fetch, base_url: str, concurrency: int, requests: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            await fetch(base_url)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def bench(args: argparse.Namespace) -> None:
+    server = FakeOpenAI(latency=args.latency)
+    base_url = await server.start()
+    settings.OPENAI_BASE_URL = base_url
+    try:
+        print(f"{'mode':<16} {'concurrency':>11} {'req/s':>8}  latency")
+        for concurrency in args.concurrency:
+            for mode, fetch in (("per-call client", fetch_per_call), ("shared client", fetch_shared)):
+                await run(fetch, base_url, concurrency, args.warmup)
+                latencies, elapsed = await run(fetch, base_url, concurrency, args.requests)
+                print(f"{mode:<16} {concurrency:>11} {len(latencies) / elapsed:>8.1f}  {summary(latencies)}")
+    finally:
+        await llm.close_client()
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 서버의 응답 지연 (초)")
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
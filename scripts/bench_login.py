@@ -0,0 +1,75 @@
+"""
+로그인 폭주 중에도 다른 API 가 응답하는지 측정.
+
+    python -m scripts.bench_login --logins 32 --seconds 20
+
+먼저 아무 부하 없이 probe 경로의 지연을 재고, 이어서 --logins 개의 작업이 sign_in 을 계속 호출하는 동안
+같은 probe 경로의 지연과 초당 로그인 수를 잼.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from scripts.bench_concurrency import sign_in, summary
+
+
+async def probe(client: httpx.AsyncClient, path: str, until: float, interval: float) -> tuple[list[float], int]:
+    """ (지연 목록, 실패 수). 실패한 요청도 실패할 때까지 걸린 시간을 지연으로 넣음 """
+    latencies: list[float] = []
+    errors = 0
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            errors += response.status_code >= 400
+        except httpx.HTTPError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies, errors
+
+
+async def storm(client: httpx.AsyncClient, username: str, password: str, until: float) -> int:
+    count = 0
+    while time.perf_counter() < until:
+        await sign_in(client, username, password)
+        count += 1
+    return count
+
+
+async def bench(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.logins + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        token = await sign_in(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        idle, errors = await probe(client, args.path, time.perf_counter() + args.seconds / 2, args.interval)
+        print(f"idle:  {args.path} {summary(idle)} errors={errors}")
+
+        until = time.perf_counter() + args.seconds
+        (during, errors), *logins = await asyncio.gather(
+            probe(client, args.path, until, args.interval),
+            *(storm(client, args.username, args.password, until) for _ in range(args.logins)),
+        )
+        print(f"storm: {args.path} {summary(during)} errors={errors}")
+        print(f"storm: {sum(logins) / args.seconds:.1f} logins/s with {args.logins} concurrent logins")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default=os.getenv("FIRST_SUPERUSER", "admin"))
+    parser.add_argument("--password", default=os.getenv("FIRST_SUPERUSER_PASSWORD", ""))
+    parser.add_argument("--path", default="/api/v1/users/me", help="로그인 중에 응답 지연을 잴 경로")
+    parser.add_argument("--logins", type=int, default=32, help="동시에 로그인하는 작업 수")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=0.05, help="probe 요청 사이 간격")
+    parser.add_argument("--timeout", type=float, default=60)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
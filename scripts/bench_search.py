@@ -0,0 +1,106 @@
+"""
+프로젝트 검색: 예전 LIKE 경로와 현재 Project.filter (pg_trgm 인덱스) 비교.
+
+    python -m scripts.seed --projects 100000
+    python -m scripts.bench_search --repeat 20
+
+검색어마다 두 경로를 번갈아 repeat 번 실행해 p50/p95 와 EXPLAIN 의 최상위 스캔 방식을 출력함.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import event, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine, new_session
+from app.models import Project
+
+QUERIES = ["분석", "인공지능", "클라우드 보안", "SaaS", "PRJ-0428", "없는검색어"]
+
+
+def legacy_stmt(query: str, limit: int):
+    """ 인덱스를 쓰기 전의 Project.filter 검색 조건 """
+    return (
+        select(Project)
+        .where(Project.title.like(f"%{query}%") | Project.summary.like(f"%{query}%")) # type: ignore
+        .offset(0)
+        .limit(limit)
+        .order_by(Project.created_at.desc()) # type: ignore
+    )
+
+
+async def current(db: AsyncSession, query: str, limit: int):
+    return await Project.filter(db, None, None, query, None, offset=0, limit=limit)
+
+
+async def legacy(db: AsyncSession, query: str, limit: int):
+    return (await db.exec(legacy_stmt(query, limit))).all()
+
+
+async def plan(db: AsyncSession, fn, query: str, limit: int) -> str:
+    """ fn 이 마지막으로 실행한 SQL 의 EXPLAIN 에서 테이블/인덱스를 읽는 노드들 """
+    captured: list[tuple] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await fn(db, query, limit)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    conn = await db.connection()
+    rows = (await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)).all()
+    scans = [line.strip().lstrip("-> ").split("  ")[0] for (line,) in rows if "Scan" in line]
+    return " / ".join(scans)
+
+
+async def timed(fn, db: AsyncSession, query: str, limit: int) -> float:
+    started = time.perf_counter()
+    await fn(db, query, limit)
+    return (time.perf_counter() - started) * 1000
+
+
+def fmt(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, round(len(ordered) * 0.95) - 1)]
+    return f"p50={statistics.median(ordered):8.1f}ms p95={p95:8.1f}ms"
+
+
+async def bench(queries: list[str], repeat: int, limit: int) -> None:
+    engine.echo = False
+    async with new_session() as db:
+        total = (await db.exec(select(func.count()).select_from(Project))).one() # type: ignore
+        print(f"project rows: {total}")
+
+        for query in queries:
+            samples: dict[str, list[float]] = {"legacy": [], "current": []}
+            await legacy(db, query, limit)
+            await current(db, query, limit)
+            for _ in range(repeat):
+                samples["legacy"].append(await timed(legacy, db, query, limit))
+                samples["current"].append(await timed(current, db, query, limit))
+
+            print(f"\n{query!r}")
+            print(f"  legacy   {fmt(samples['legacy'])}  {await plan(db, legacy, query, limit)}")
+            print(f"  current  {fmt(samples['current'])}  {await plan(db, current, query, limit)}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", action="append", help=f"기본: {QUERIES}")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(bench(args.query or QUERIES, args.repeat, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+첨부파일 업로드 중 서버 메모리 (peak RSS) 측정.
+
+    STORAGE_BACKEND=azure uvicorn app.main:app --port 8000 &
+    python -m scripts.bench_upload --pid $! --sizes 10 100 500
+
+STORAGE_BACKEND=azure 로 띄워야 blob.upload_blob_stream 의 블록 stage 경로를 잼 (local 은 디스크에 바로 씀).
+
+크기가 작은 것부터 차례로 무작위 내용의 파일을 /dashboard/upload_file 로 올리고, 매번 서버 프로세스의
+VmHWM (지금까지의 최대 RSS) 을 읽음. 스트리밍 업로드라면 파일이 커져도 VmHWM 이 거의 늘지 않음.
+서버와 같은 호스트에서 실행해야 /proc/<pid>/status 를 읽을 수 있음.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from scripts.bench_concurrency import sign_in
+
+MB = 1024 * 1024
+
+
+def memory_kb(pid: int) -> dict[str, int]:
+    """ /proc/<pid>/status 의 VmRSS, VmHWM (kB) """
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(value.split()[0])
+    return values
+
+
+def make_file(size_mb: int) -> str:
+    # 내용이 같으면 중복 제거로 업로드를 건너뛰므로 매번 무작위 내용
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(MB))
+    return path
+
+
+async def first_project(client: httpx.AsyncClient) -> str:
+    response = await client.get("/api/v1/dashboard", params={"limit": 1})
+    response.raise_for_status()
+    projects = response.json()["projects"]
+    if not projects:
+        raise SystemExit("프로젝트가 없습니다. scripts.seed 로 먼저 만드세요.")
+    return projects[0]["u_id"]
+
+
+async def bench(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        token = await sign_in(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        project = args.project or await first_project(client)
+
+        print(f"{'size':>8} {'seconds':>8} {'VmRSS':>10} {'VmHWM':>10}")
+        before = memory_kb(args.pid)
+        print(f"{'idle':>8} {'':>8} {before['VmRSS'] // 1024:>8}MB {before['VmHWM'] // 1024:>8}MB")
+
+        for size_mb in sorted(args.sizes):
+            path = make_file(size_mb)
+            try:
+                started = time.perf_counter()
+                with open(path, "rb") as f:
+                    response = await client.post(
+                        "/api/v1/dashboard/upload_file",
+                        data={"u_id": project},
+                        files={"file": (f"bench-{size_mb}mb.bin", f)},
+                    )
+                response.raise_for_status()
+                elapsed = time.perf_counter() - started
+            finally:
+                os.remove(path)
+
+            after = memory_kb(args.pid)
+            print(f"{size_mb:>6}MB {elapsed:>8.1f} {after['VmRSS'] // 1024:>8}MB {after['VmHWM'] // 1024:>8}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, required=True, help="uvicorn 서버 프로세스 id")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default=os.getenv("FIRST_SUPERUSER", "admin"))
+    parser.add_argument("--password", default=os.getenv("FIRST_SUPERUSER_PASSWORD", ""))
+    parser.add_argument("--project", help="파일을 붙일 프로젝트 u_id (기본: 목록의 첫 프로젝트)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500], help="MB 단위")
+    parser.add_argument("--timeout", type=float, default=600)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
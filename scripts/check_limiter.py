@@ -0,0 +1,171 @@
+"""
+LLM limiter 가 서버의 429 / x-ratelimit-* 헤더에 맞게 동작하는지 확인.
+
+    python -m scripts.check_limiter
+
+같은 프로세스에 OpenAI 호환 가짜 서버 (scripts.fake_openai) 를 띄우고 llm.infer 로 호출함.
+확인마다 llm.limiter 를 새로 만들고 공유 클라이언트를 닫아, 앞의 확인이 남긴 예산/멈춤이 섞이지 않게 함.
+- sync: 200 응답의 x-ratelimit-limit/remaining-requests 로 요청 예산이 줄어듦 (_observe_response)
+- retry: SDK 가 재시도한 429 응답도 hook 을 거쳐 limiter 를 멈춤
+- pause: 429 의 retry-after-ms 동안 다음 호출이 서버로 나가지 않음 (Limiter.pause)
+- fifo: 멈춘 동안 쌓인 호출이 들어온 순서대로 나감
+- timeout: 멈춘 시간이 LLM_QUEUE_TIMEOUT_SECONDS 보다 길면 서버에 보내지 않고 LimiterTimeout
+하나라도 실패하면 종료 코드 1
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.core.ratelimit import Limiter, LimiterTimeout
+from app.models import Prompt, User
+from app.modules import llm
+from scripts.fake_openai import FakeOpenAI
+
+USER = User()
+
+
+def prompt(text: str = "ping") -> Prompt:
+    return Prompt(request_id=uuid.uuid4(), user=USER, user_prompt=text)
+
+
+class Checks:
+
+    def __init__(self, server: FakeOpenAI):
+        self.server = server
+        self.failed = 0
+
+    def report(self, name: str, ok: bool, detail: str) -> None:
+        self.failed += not ok
+        print(f"{'PASS' if ok else 'FAIL':<4} {name:<8} {detail}")
+
+    async def reset(self, max_in_flight: int = 8, timeout: float = 5, max_retries: int = 0) -> None:
+        """ 새 limiter 와 새 클라이언트로 시작. 서버의 요청 창과 강제 429 도 비움 """
+        await llm.close_client()
+        settings.OPENAI_MAX_RETRIES = max_retries
+        llm.limiter = Limiter(
+            max_in_flight=max_in_flight,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            timeout=timeout,
+        )
+        self.server._window.clear()
+        self.server._forced.clear()
+
+    async def sync(self) -> None:
+        await self.reset()
+        self.server.requests_per_minute = 5
+        for _ in range(3):
+            await llm.infer(prompt())
+        stats = llm.limiter.stats()
+        self.server.requests_per_minute = None
+        self.report(
+            "sync",
+            stats["requests_per_minute"] == 5 and stats["requests_available"] < 3,
+            f"limit {stats['requests_per_minute']}, available {stats['requests_available']:.2f} (서버 잔량 2)",
+        )
+
+    async def retry(self) -> None:
+        await self.reset(max_retries=2)
+        self.server.force_429(1, 0.3)
+        rejected = self.server.rejected
+        started = time.perf_counter()
+        parsed = await llm.infer(prompt())
+        elapsed = time.perf_counter() - started
+        throttled = llm.limiter.throttled
+        self.report(
+            "retry",
+            parsed is not None and self.server.rejected == rejected + 1 and throttled == 1,
+            f"429 {self.server.rejected - rejected}번 뒤 성공, throttled {throttled}, {elapsed:.2f}s",
+        )
+
+    async def pause(self, retry_after: float) -> None:
+        await self.reset()
+        self.server.force_429(1, retry_after)
+        try:
+            await llm.infer(prompt())
+        except RateLimitError:
+            pass
+        paused = llm.limiter.stats()["paused_seconds"]
+        accepted = self.server.accepted
+        started = time.perf_counter()
+        await llm.infer(prompt())
+        elapsed = time.perf_counter() - started
+        self.report(
+            "pause",
+            paused > retry_after - 0.1 and elapsed >= retry_after - 0.1 and self.server.accepted == accepted + 1,
+            f"retry-after {retry_after:.2f}s, 멈춤 {paused:.2f}s, 다음 호출 {elapsed:.2f}s",
+        )
+
+    async def fifo(self, count: int) -> None:
+        await self.reset(max_in_flight=1)
+        self.server.latency = 0.02
+        llm.limiter.pause(0.3)
+        order: list[int] = []
+
+        async def call(i: int) -> None:
+            await llm.infer(prompt(f"ping {i}"))
+            order.append(i)
+
+        tasks = []
+        for i in range(count):
+            tasks.append(asyncio.create_task(call(i)))
+            # 앞 태스크가 대기열에 들어간 뒤에 다음 태스크를 만듦
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        self.server.latency = 0.0
+        self.report("fifo", order == list(range(count)), f"완료 순서 {order}")
+
+    async def timeout(self, retry_after: float, timeout: float) -> None:
+        await self.reset(timeout=timeout)
+        self.server.force_429(1, retry_after)
+        try:
+            await llm.infer(prompt())
+        except RateLimitError:
+            pass
+        accepted, rejected = self.server.accepted, self.server.rejected
+        started = time.perf_counter()
+        raised = False
+        try:
+            await llm.infer(prompt())
+        except LimiterTimeout:
+            raised = True
+        elapsed = time.perf_counter() - started
+        sent = (self.server.accepted - accepted) + (self.server.rejected - rejected)
+        timeouts = llm.limiter.timeouts
+        self.report(
+            "timeout",
+            raised and sent == 0 and timeouts == 1 and elapsed < retry_after,
+            f"LimiterTimeout {raised}, {elapsed:.2f}s 만에 포기, 서버로 나간 요청 {sent}, timeouts {timeouts}",
+        )
+
+
+async def check(args: argparse.Namespace) -> int:
+    server = FakeOpenAI()
+    settings.OPENAI_BASE_URL = await server.start()
+    checks = Checks(server)
+    try:
+        await checks.sync()
+        await checks.retry()
+        await checks.pause(args.retry_after)
+        await checks.fifo(args.fifo)
+        await checks.timeout(args.retry_after * 4, args.retry_after)
+    finally:
+        await llm.close_client()
+        await server.stop()
+    return 1 if checks.failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retry-after", type=float, default=0.5, help="강제 429 의 retry-after (초)")
+    parser.add_argument("--fifo", type=int, default=6, help="fifo 확인에서 쌓을 호출 수")
+    sys.exit(asyncio.run(check(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
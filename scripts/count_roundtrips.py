@@ -0,0 +1,127 @@
+"""
+요청 하나가 DB 와 주고받는 횟수 (BEGIN, SQL 문, COMMIT/ROLLBACK) 세기.
+
+    python -m scripts.count_roundtrips
+
+각 경로를 핸들러가 부르는 함수 그대로 한 번씩 실행하면서 엔진 이벤트로 셈 (인증용 유저 조회는 뺌).
+/dashboard/create 는 project_cache 에 응답을 미리 넣어 LLM 을 부르지 않고 저장 과정만 셈.
+변경 전/후 비교는 같은 DB 에서 각 커밋을 체크아웃해 같은 명령을 실행함.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlmodel import insert
+
+from app.core.config import settings
+from app.core.db import engine, init_db, new_session
+from app.models import BizClient, BusinessCard, Program, Project, User
+from app.models.enum import ProgramStatus
+from app.modules import llm
+from app.modules.project_jobs import generate_project, project_cache, project_cache_key
+from scripts.seed import _bizcard, _project
+
+
+class RoundTrips:
+    """ with 블록 안에서 엔진을 거친 BEGIN / SQL 문 / COMMIT / ROLLBACK 수 """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._listeners = {
+            "begin": lambda conn: self.counts.update(["begin"]),
+            "before_cursor_execute": lambda conn, cursor, statement, *args: self.counts.update(["statement"]),
+            "commit": lambda conn: self.counts.update(["commit"]),
+            "rollback": lambda conn: self.counts.update(["rollback"]),
+        }
+
+    def __enter__(self) -> "RoundTrips":
+        for name, listener in self._listeners.items():
+            event.listen(engine.sync_engine, name, listener)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for name, listener in self._listeners.items():
+            event.remove(engine.sync_engine, name, listener)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.counts.total():>5} "
+            f"{self.counts['begin']:>6} {self.counts['statement']:>10} {self.counts['commit']:>7} {self.counts['rollback']:>9}"
+        )
+
+
+async def fixtures() -> tuple[User, Project, BizClient, Program]:
+    rng = random.Random(0)
+    project, bizcard = _project(rng, datetime.now()), _bizcard(rng)
+    program = Program(client_u_id=bizcard["u_id"], title="count_roundtrips")
+    async with new_session() as db:
+        await db.exec(insert(Project).values(project)) # type: ignore
+        await db.exec(insert(BizClient).values(bizcard)) # type: ignore
+        db.add(program)
+        await db.commit()
+        user = await User.get(db, settings.FIRST_SUPERUSER)
+    if user is None:
+        raise SystemExit("FIRST_SUPERUSER 유저가 없습니다.")
+    return user, Project(**project), BizClient(**bizcard), program
+
+
+def canned_project(query: str) -> None:
+    """ generate_project 가 LLM 대신 캐시를 쓰게 함 """
+    now = datetime.now()
+    response = llm.ProjectGPTResponse(
+        title=query,
+        summary="count_roundtrips",
+        content="count_roundtrips",
+        start_date=int(now.timestamp()),
+        end_date=int(now.timestamp()),
+    )
+    project_cache.set(project_cache_key(query), (now, response))
+
+
+async def count(args: argparse.Namespace) -> None:
+    engine.echo = False
+    async with new_session() as db:
+        await init_db(db)
+    user, project, bizcard, program = await fixtures()
+
+    query = f"count_roundtrips {uuid.uuid4()}"
+    canned_project(query)
+    statuses = list(ProgramStatus)
+
+    def card(i: int) -> BusinessCard:
+        return BusinessCard.model_validate({**bizcard.biz_card, "role": f"팀장 {i}"})
+
+    # 값이 그대로면 ORM 이 UPDATE 를 건너뛸 수 있으므로 실행마다 값을 바꿈
+    cases = {
+        "POST /dashboard/create (sync)": lambda db, i: generate_project(db, user, uuid.uuid4(), query),
+        "PUT  /dashboard/modify": lambda db, i: Project.put(
+            db, f"{project.title} {i}", project.summary, project.content, project.priority, project.category,
+            project.start_date, project.end_date, u_id=project.u_id
+        ),
+        "PUT  /biz": lambda db, i: BizClient.update_bizcard(db, bizcard.u_id, card(i)),
+        "Program.update_status": lambda db, i: Program.update_status(db, program.u_id, statuses[(i + 1) % len(statuses)]),
+    }
+
+    print(f"{'path':<32} {'total':>5} {'begin':>6} {'statements':>10} {'commits':>7} {'rollbacks':>9}")
+    for name, call in cases.items():
+        for i in range(args.repeat):
+            async with new_session() as db:
+                with RoundTrips() as trips:
+                    await call(db, i)
+        print(f"{name:<32} {trips}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2, help="경로마다 실행할 횟수 (마지막 실행을 출력, 첫 실행은 캐시 등을 채움)")
+    asyncio.run(count(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+벤치마크/확인용 OpenAI 호환 가짜 서버. /v1/chat/completions 만 흉내냄.
+
+    python -m scripts.fake_openai --port 8100 --rpm 60
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app
+
+content 를 그대로 assistant 메시지로 돌려주므로 structured output 은 응답 모델에 맞는 JSON 을 주면 됨.
+requests_per_minute 를 주면 최근 60초 동안 그보다 많이 온 요청에 429 (retry-after, x-ratelimit-*) 를 보냄.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+from aiohttp import web
+
+
+class FakeOpenAI:
+
+    def __init__(
+        self,
+        content: str = '{"response": "ok"}',
+        requests_per_minute: int | None = None,
+        latency: float = 0.0,
+        send_limit_headers: bool = True,
+    ):
+        self.content = content
+        self.requests_per_minute = requests_per_minute
+        self.latency = latency
+        self.send_limit_headers = send_limit_headers
+
+        self.accepted = 0
+        self.rejected = 0
+        # 다음 n 개의 요청은 한도와 상관없이 429 (retry-after 초)
+        self._forced: deque[float] = deque()
+        self._window: deque[float] = deque()
+        self._runner: web.AppRunner | None = None
+
+    def force_429(self, count: int, retry_after: float) -> None:
+        self._forced.extend([retry_after] * count)
+
+    def _limit_headers(self, remaining: int, reset: float) -> dict[str, str]:
+        if not self.send_limit_headers or self.requests_per_minute is None:
+            return {}
+        return {
+            "x-ratelimit-limit-requests": str(self.requests_per_minute),
+            "x-ratelimit-remaining-requests": str(remaining),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        }
+
+    def _throttle(self) -> float | None:
+        """ 429 를 보낼 거면 기다릴 초, 아니면 None """
+        if self._forced:
+            return self._forced.popleft()
+        if self.requests_per_minute is None:
+            return None
+
+        now = time.monotonic()
+        while self._window and self._window[0] <= now - 60:
+            self._window.popleft()
+        if len(self._window) >= self.requests_per_minute:
+            return self._window[0] + 60 - now
+        self._window.append(now)
+        return None
+
+    def _reset(self) -> float:
+        return self._window[0] + 60 - time.monotonic() if self._window else 0.0
+
+    async def _completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        retry_after = self._throttle()
+        if retry_after is not None:
+            self.rejected += 1
+            headers = {"retry-after-ms": str(int(retry_after * 1000)), **self._limit_headers(0, retry_after)}
+            error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            return web.json_response(error, status=429, headers=headers)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.accepted += 1
+        remaining = (self.requests_per_minute or 0) - len(self._window)
+        completion = {
+            "id": f"chatcmpl-{self.accepted}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.content, "refusal": None},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+        return web.json_response(completion, headers=self._limit_headers(remaining, self._reset()))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """ 서버를 띄우고 OPENAI_BASE_URL 로 쓸 주소를 반환 (port=0 이면 빈 포트) """
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = self._runner.addresses[0][1]
+        return f"http://{host}:{bound}/v1"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = FakeOpenAI(content=args.content, requests_per_minute=args.rpm, latency=args.latency)
+    print(await server.start(port=args.port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--rpm", type=int, help="분당 허용 요청 수 (기본: 제한 없음)")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답마다 기다릴 초")
+    parser.add_argument("--content", default=json.dumps({"response": "ok"}), help="assistant 메시지 내용")
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
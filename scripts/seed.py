@@ -0,0 +1,121 @@
+"""
+벤치마크용 합성 데이터 생성.
+
+    python -m scripts.seed --projects 100000 --bizcards 10000
+
+app 과 같은 환경변수(POSTGRES_* 등)로 DB 에 접속하고, init_db 로 테이블/인덱스를 만든 뒤 배치로 insert 함.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import insert
+
+from app.core.db import engine, init_db, new_session
+from app.models import BizClient, Project, ProjectCategory, ProjectPriority
+from app.models.bizcard import build_search_key
+
+WORDS = [
+    "교육", "컨설팅", "마케팅", "데이터", "분석", "플랫폼", "구축", "운영", "개선", "고도화",
+    "인공지능", "클라우드", "보안", "점검", "세미나", "워크숍", "리포트", "대시보드", "자동화", "연구",
+    "CRM", "ERP", "AI", "API", "DB", "MVP", "PoC", "SaaS", "B2B", "KPI",
+]
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+GIVEN_NAMES = ["민준", "서연", "도윤", "지우", "하준", "서윤", "시우", "하은", "지호", "수아"]
+COMPANIES = ["한빛", "새롬", "누리", "다온", "가람", "아라", "보람", "나래", "하람", "미르"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _project(rng: random.Random, now: datetime) -> dict:
+    # 검색 선택도가 높은 경우를 재기 위한 거의 유일한 코드 (예: PRJ-042817)
+    code = f"PRJ-{rng.randint(0, 999_999):06d}"
+    start = now + timedelta(days=rng.randint(-365, 30))
+    end = start + timedelta(days=rng.randint(1, 365))
+    created = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+    return dict(
+        u_id=uuid.uuid4(),
+        title=f"{_sentence(rng, 3)} {code}",
+        summary=_sentence(rng, 10),
+        content=_sentence(rng, 60),
+        priority=rng.choice(list(ProjectPriority)),
+        category=rng.choice(list(ProjectCategory)),
+        start_date=int(start.timestamp()),
+        end_date=int(end.timestamp()),
+        created_at=int(created.timestamp()),
+        updated_at=int(created.timestamp()),
+    )
+
+
+def _bizcard(rng: random.Random) -> dict:
+    company = rng.choice(COMPANIES) + rng.choice(["테크", "솔루션", "컨설팅", "교육"])
+    biz_card = {
+        "u_id": str(uuid.uuid4()),
+        "name": rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+        "role": rng.choice(["대표", "팀장", "매니저", "연구원"]),
+        "phone_number": f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "email": f"user{rng.randint(0, 10**6)}@example.com",
+        "company": {
+            "u_id": str(uuid.uuid4()),
+            "name": company,
+            "address": "서울시 " + rng.choice(["강남구", "마포구", "성동구", "종로구"]),
+            "english_name": None,
+            "website": None,
+        },
+    }
+    return dict(
+        u_id=uuid.uuid4(),
+        biz_card=biz_card,
+        category=rng.choice(["고객", "파트너", "기타"]),
+        search_key=build_search_key(biz_card),
+    )
+
+
+async def _insert(table, rows: list[dict]) -> None:
+    async with new_session() as db:
+        await db.exec(insert(table).values(rows)) # type: ignore
+        await db.commit()
+
+
+async def seed(projects: int, bizcards: int, batch: int, random_seed: int) -> None:
+    rng = random.Random(random_seed)
+    # insert 문이 매우 길어지므로 SQL 로그는 끔
+    engine.echo = False
+    now = datetime.now()
+
+    async with new_session() as db:
+        await init_db(db)
+
+    for table, count, make in (
+        (Project, projects, lambda: _project(rng, now)),
+        (BizClient, bizcards, lambda: _bizcard(rng)),
+    ):
+        started = time.perf_counter()
+        for offset in range(0, count, batch):
+            await _insert(table, [make() for _ in range(min(batch, count - offset))])
+        if count:
+            print(f"{table.__tablename__}: {count} rows in {time.perf_counter() - started:.1f}s")
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE project")
+        await conn.exec_driver_sql("ANALYZE bizclient")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--bizcards", type=int, default=1_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(seed(args.projects, args.bizcards, args.batch, args.seed))
+
+
+if __name__ == "__main__":
+    main()